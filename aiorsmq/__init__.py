@@ -1,4 +1,16 @@
-from .aiorsmq import AIORSMQ, Message, QueueAttributes
+from .aiorsmq import AIORSMQ, Message, Queue, QueueAttributes
+from .consumer import MessageIterator
+from .partitioned import PartitionedQueue
+from .worker import Worker
 from .__version__ import __version__
 
-__all__ = ["AIORSMQ", "Message", "QueueAttributes", "__version__"]
+__all__ = [
+    "AIORSMQ",
+    "Message",
+    "MessageIterator",
+    "PartitionedQueue",
+    "Queue",
+    "QueueAttributes",
+    "Worker",
+    "__version__",
+]
@@ -1,23 +1,74 @@
 from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Dict,
     List,
     Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
     Union,
     NamedTuple,
 )
+import asyncio
 import re
 
 import aioredis  # type: ignore
 
-from aiorsmq import scripts, exceptions, compat, utils
+from aiorsmq import (
+    scripts,
+    exceptions,
+    compat,
+    realtime,
+    consumer,
+    utils,
+    batching,
+    codecs,
+    offload,
+    instrumentation,
+    hooks,
+)
+
+# Maximum time to wait for a real time notification before checking the queue
+# again, when receiving messages with `wait_time`.
+_WAIT_POLL_INTERVAL = 1.0
+
+_QUEUE_NAME_RE = re.compile(compat.QUEUE_NAME_RE)
+_ID_RE = re.compile(compat.ID_RE)
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 class Message:
-    """Represents a message received from a message queue."""
+    """Represents a message received from a message queue.
+
+    Derived values (such as `sent`) and the decoded contents of the message are
+    only computed the first time they are accessed.
+    """
 
-    __slots__ = ["contents", "id", "fr", "rc", "sent"]
+    __slots__ = [
+        "_contents",
+        "_codec",
+        "_id",
+        "_fr",
+        "_sent",
+        "_encoding",
+        "_offload",
+        "rc",
+    ]
 
     def __init__(
-        self, *, contents: Union[str, bytes], id: str, fr: int, rc: int, sent: float
+        self,
+        *,
+        contents: Any,
+        id: Union[str, bytes],
+        fr: Union[int, str, bytes],
+        rc: int,
+        sent: Optional[float] = None,
+        codec: Optional[codecs.Codec] = None,
+        encoding: str = "utf-8",
     ) -> None:
         """Initialize a `Message` object.
 
@@ -33,12 +84,85 @@ class Message:
             rc: Number of times this message has been received by
                 consumers. Will always be at least 1.
             sent: UNIX timestamp indicating when the message was sent (in milliseconds).
+                If not specified, it is computed from the message's ID.
+            codec: Codec to use for decoding the contents of the message.
+            encoding: Encoding to use for decoding `id` and `fr`, when they are
+                instances of `bytes`.
         """
-        self.contents = contents
-        self.id = id
-        self.fr = fr
+        self._contents = contents
+        self._codec = codec
+        self._id = id
+        self._fr = fr
+        self._sent = sent
+        self._encoding = encoding
+        self._offload: Optional[Tuple[aioredis.Redis, str, int, bool]] = None
         self.rc = rc
-        self.sent = sent
+
+    @property
+    def contents(self) -> Any:
+        """Contents of the message."""
+        if self._offload is not None:
+            raise exceptions.InvalidValueException(
+                "The contents of this message must be read using `stream`."
+            )
+
+        if self._codec is not None:
+            self._contents = self._codec.decode(self._contents)
+            self._codec = None
+
+        return self._contents
+
+    async def stream(self) -> AsyncIterator[Union[str, bytes]]:
+        """Iterate over the contents of the message, in chunks.
+
+        This method must be used for reading the contents of offloaded messages
+        received using an `AIORSMQ` object with `offload_stream=True` (see
+        `AIORSMQ`'s `offload_threshold` parameter). Chunks are fetched from Redis
+        while iterating, so the contents never need to be fully buffered. For other
+        messages, the contents are returned as a single chunk.
+
+        **Note:** The chunks are not decoded using the `AIORSMQ` object's codec.
+
+        Raises:
+            exceptions.MessageNotFoundException: When the contents of an offloaded
+                message no longer exist (e.g. because the message was deleted), or
+                were deleted or expired while reading them.
+
+        Returns:
+            Asynchronous iterator over the chunks of the message's contents.
+        """
+        if self._offload is None:
+            yield self._contents
+            return
+
+        async for chunk in offload.read_chunks(*self._offload):
+            yield chunk
+
+    @property
+    def id(self) -> str:
+        """Message's unique ID."""
+        if isinstance(self._id, bytes):
+            self._id = self._id.decode(self._encoding)
+
+        return self._id
+
+    @property
+    def fr(self) -> int:
+        """UNIX timestamp indicating when the message was first receieved (in
+        milliseconds).
+        """
+        if not isinstance(self._fr, int):
+            self._fr = int(self._fr)
+
+        return self._fr
+
+    @property
+    def sent(self) -> float:
+        """UNIX timestamp indicating when the message was sent (in milliseconds)."""
+        if self._sent is None:
+            self._sent = compat.base36_decode(self.id[:10]) / 1000
+
+        return self._sent
 
 
 class QueueAttributes:
@@ -104,8 +228,14 @@ class _QueueContext(NamedTuple):
     vt: int
     delay: int
     max_size: int
-    ts: int
-    uid: Optional[str]
+
+
+class _QueueKeys(NamedTuple):
+    name: str
+    sorted_set: str
+    hash: str
+    rt: str
+    chunks_prefix: str
 
 
 class AIORSMQ:
@@ -122,15 +252,39 @@ class AIORSMQ:
         self,
         *,
         client: aioredis.Redis,
+        read_client: Optional[aioredis.Redis] = None,
+        pubsub_client: Optional[aioredis.Redis] = None,
         client_encoding: str = "utf-8",
         namespace: str = compat.DEFAULT_NAMESPACE,
+        hash_tags: bool = False,
         real_time: bool = False,
+        real_time_interval: Optional[float] = None,
+        codec: Optional[codecs.Codec] = None,
+        offload_threshold: Optional[int] = None,
+        offload_chunk_size: int = 65536,
+        offload_stream: bool = False,
+        send_batch_delay: Optional[float] = None,
+        send_batch_size: int = 100,
+        delete_batch_delay: Optional[float] = None,
+        delete_batch_size: int = 100,
+        metrics: Optional[instrumentation.Metrics] = None,
+        hooks: Optional[Sequence[hooks.Hook]] = None,
     ) -> None:
         """Initialize an `AIORSMQ` object.
 
         Args:
             client: Redis client to use internally (create it using the `aioredis`
                 package).
+            read_client: Redis client to use for read-only queries
+                (`get_queue_attributes` and `list_queues`), e.g. one connected to a
+                replica of the server `client` is connected to. Note that replicas may
+                return slightly outdated results. If not specified, `client` is used.
+            pubsub_client: Redis client to use for real time notifications: the
+                pub/sub connection used by `wait_time`, and the notifications
+                published because of `real_time_interval`. Using a
+                separate client keeps notification traffic out of the connection pool
+                used for sending and receiving messages. It must be connected to the
+                same server as `client`. If not specified, `client` is used.
             client_encoding: When the Redis client has been configured with
                 `decode_responses=True`, please ensure that the value of this parameter
                 matches the encoding used for the Redis client. When the Redis client
@@ -139,23 +293,146 @@ class AIORSMQ:
                 also `utf-8`, so in most cases setting this parameter manually will not
                 be necessary.
             namespace: Namespace to prefix keys with.
+            hash_tags: Use a key layout compatible with Redis Cluster, in which
+                queue names are wrapped in a hash tag (e.g. `rsmq:{myqueue}` and
+                `rsmq:{myqueue}:Q`). All keys of a queue are then stored in the same
+                cluster slot, so different queues can be spread across shards. Queues
+                created using this layout are not accessible by clients using the
+                default one (including the JavaScript implementation).
             real_time: Enable real time mode. When enabled, a notification will be
                 sent using Redis `PUBLISH` each time a message is added to a message
                 queue.
+            real_time_interval: Limit the rate of real time notifications, to at
+                most one every `real_time_interval` seconds per queue. Messages sent
+                within the interval are announced by a single notification (carrying
+                the queue's latest size), published once the interval has elapsed.
+                The limit applies to each `AIORSMQ` object separately.
+            codec: Codec to use for encoding the contents of messages before sending
+                them, and for decoding them when they are received (see
+                `aiorsmq.codecs`). The queue's maximum message size applies to the
+                encoded contents. Received messages are decoded the first time their
+                `contents` attribute is accessed. When not specified, contents are
+                stored as-is.
+            offload_threshold: Enable offloading of large messages. Messages larger
+                than the specified size (in bytes, after being encoded) are stored in
+                separate keys, split into chunks, and only a small reference to them
+                is stored in the queue itself. Messages of exactly the specified size
+                are stored in the queue as usual. Offloaded messages are not subject to
+                the queue's maximum message size. Received offloaded messages are
+                fetched using a single round trip per receive, and deleting or popping
+                them also deletes their chunks. All clients using a queue that
+                contains offloaded messages must enable this option.
+            offload_chunk_size: Maximum size of each chunk of an offloaded message
+                (in bytes).
+            offload_stream: When enabled, the contents of offloaded messages are not
+                fetched when receiving them. Instead, they must be read using
+                `Message.stream`, which fetches them while iterating.
+            send_batch_delay: Enable coalescing of concurrent `send_message` calls.
+                When enabled, messages sent to the same queue within the specified
+                amount of time (in seconds) are sent together using a single round
+                trip to Redis, and each call returns the ID of its own message. This
+                increases the latency of each call by up to `send_batch_delay`, in
+                exchange for a higher throughput when many coroutines send messages
+                concurrently. `quit` sends any pending messages before closing the
+                connection.
+            send_batch_size: Maximum number of messages to coalesce into a single
+                round trip, when `send_batch_delay` is set.
+            delete_batch_delay: Enable coalescing of concurrent `delete_message`
+                calls, in the same way as `send_batch_delay` does for `send_message`.
+                `quit` deletes any pending messages before closing the connection.
+            delete_batch_size: Maximum number of messages to delete using a single
+                round trip, when `delete_batch_delay` is set.
+            metrics: Object to record the number of calls, errors, round trips to
+                Redis and latencies of each operation into (see
+                `aiorsmq.instrumentation`). Round trips made for calls coalesced
+                because of `send_batch_delay` or `delete_batch_delay` are recorded
+                for only one of the calls of each batch.
+            hooks: Hooks to call when sending and receiving messages (see
+                `aiorsmq.hooks` and `add_hook`).
         """
+        self._metrics = metrics
+        self._hooks = list(hooks or [])
         self._client = client
-        self._client_encoding = client_encoding
+        self._read_client = client if read_client is None else read_client
+        self._pubsub_client = client if pubsub_client is None else pubsub_client
         self._ns = namespace
+        self._hash_tags = hash_tags
         self._real_time = real_time
+        self._codec = codec
+        self._offload_threshold = offload_threshold
+        self._offload_chunk_size = offload_chunk_size
+        self._offload_stream = offload_stream
+
+        if (offload_threshold is not None and offload_threshold < 0) or (
+            offload_chunk_size < 1
+        ):
+            raise exceptions.InvalidValueException(
+                "Incorrect value for offload_threshold or offload_chunk_size parameter."
+            )
+
+        try:
+            self._client_encoding = utils.normalize_encoding(client_encoding)
+        except LookupError:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for client_encoding parameter."
+            )
 
-        self._script_pop_message = self._client.register_script(scripts.POP_MESSAGE)
-        self._script_receive_message = self._client.register_script(
-            scripts.RECEIVE_MESSAGE
+        self._listener = realtime.RealTimeListener(
+            client=self._pubsub_client, client_encoding=self._client_encoding
         )
-        self._script_change_message_visibility = self._client.register_script(
-            scripts.CHANGE_MESSAGE_VISIBILITY
+
+        self._throttle: Optional[realtime.NotificationThrottle] = None
+        if real_time_interval is not None:
+            if real_time_interval < 0:
+                raise exceptions.InvalidValueException(
+                    "Incorrect value for real_time_interval parameter."
+                )
+
+            self._throttle = realtime.NotificationThrottle(
+                interval=real_time_interval, publish=self._publish_queue_size
+            )
+
+        self._send_batcher: Optional[
+            batching.Batcher[Tuple[Any, Optional[int]], str]
+        ] = None
+        if send_batch_delay is not None:
+            self._send_batcher = self._create_batcher(
+                self._send_message_batch, send_batch_delay, send_batch_size, "send"
+            )
+
+        self._delete_batcher: Optional[batching.Batcher[str, bool]] = None
+        if delete_batch_delay is not None:
+            self._delete_batcher = self._create_batcher(
+                self._delete_message_batch,
+                delete_batch_delay,
+                delete_batch_size,
+                "delete",
+            )
+
+        self._script_send_messages = self._client.register_script(scripts.SEND_MESSAGES)
+        self._script_pop_messages = self._client.register_script(scripts.POP_MESSAGES)
+        self._script_publish_queue_size = self._client.register_script(
+            scripts.PUBLISH_QUEUE_SIZE
+        )
+        self._script_receive_messages = self._client.register_script(
+            scripts.RECEIVE_MESSAGES
+        )
+        self._script_change_messages_visibility = self._client.register_script(
+            scripts.CHANGE_MESSAGES_VISIBILITY
         )
 
+    @staticmethod
+    def _create_batcher(
+        execute: batching.Execute[T, R], delay: float, size: int, name: str
+    ) -> batching.Batcher[T, R]:
+        if delay < 0 or size < 1:
+            raise exceptions.InvalidValueException(
+                f"Incorrect value for {name}_batch_delay or {name}_batch_size "
+                "parameter."
+            )
+
+        return batching.Batcher(execute=execute, max_size=size, max_delay=delay)
+
     @staticmethod
     def _validate(
         queue_name: Optional[str] = None,
@@ -163,11 +440,13 @@ class AIORSMQ:
         vt: Optional[int] = None,
         delay: Optional[int] = None,
         max_size: Optional[int] = None,
+        count: Optional[int] = None,
+        wait_time: Optional[float] = None,
     ) -> None:
-        if queue_name is not None and not re.match(compat.QUEUE_NAME_RE, queue_name):
+        if queue_name is not None and not _QUEUE_NAME_RE.match(queue_name):
             raise exceptions.InvalidValueException("Incorrect format for queue name.")
 
-        if id is not None and not re.match(compat.ID_RE, id):
+        if id is not None and not _ID_RE.match(id):
             raise exceptions.InvalidValueException("Incorrect format for message ID.")
 
         if vt is not None and not (compat.MIN_VT <= vt <= compat.MAX_VT):
@@ -186,39 +465,92 @@ class AIORSMQ:
                 "Incorrect value for max_size parameter."
             )
 
-    async def _get_queue_context(
-        self, queue_name: str, add_uid: bool = False
-    ) -> _QueueContext:
-        key_hash = compat.queue_hash(self._ns, queue_name)
-        pipeline = self._client.pipeline()
+        if count is not None and count < 1:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for count parameter."
+            )
 
-        pipeline.hmget(key_hash, [compat.VT, compat.DELAY, compat.MAX_SIZE])
-        pipeline.time()
+        if wait_time is not None and wait_time < 0:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for wait_time parameter."
+            )
 
-        result = await pipeline.execute()
+    def _queue_keys(self, queue_name: str) -> _QueueKeys:
+        base = compat.hash_tag(queue_name) if self._hash_tags else queue_name
 
-        if any([v is None for v in result[0]]):
-            raise exceptions.QueueNotFoundException(
-                f"Queue '{queue_name}' does not exist."
-            )
+        return _QueueKeys(
+            name=queue_name,
+            sorted_set=compat.queue_sorted_set(self._ns, base),
+            hash=compat.queue_hash(self._ns, base),
+            rt=compat.queue_rt(self._ns, queue_name),
+            chunks_prefix=compat.queue_chunks_prefix(self._ns, base),
+        )
+
+    def queue(self, queue_name: str) -> "Queue":
+        """Create a handle for a message queue.
+
+        The queue name is validated and the Redis keys used by the queue are computed
+        only once, when the handle is created, instead of on every call. This makes
+        handles the preferred way of sending and receiving messages at high rates.
 
-        unix_time: int = result[1][0]
-        microseconds: int = result[1][1]
+        **Note:** This method does not check whether the queue exists.
 
-        uid: Optional[str] = None
-        ts: int = (unix_time * 1000) + (microseconds // 1000)
+        Args:
+            queue_name: Name of the message queue.
+
+        Raises:
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
+
+        Returns:
+            Handle for the message queue.
+        """
+        self._validate(queue_name=queue_name)
+
+        return Queue(rsmq=self, keys=self._queue_keys(queue_name))
+
+    def add_hook(self, hook: hooks.Hook) -> None:
+        """Register a hook, to be called when sending and receiving messages.
+
+        Hooks apply to all queues, including those accessed through `Queue` handles.
+        When no hooks are registered, calling them has no overhead.
+
+        Args:
+            hook: Hook to register.
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: hooks.Hook) -> None:
+        """Unregister a hook previously registered using `add_hook` (or the `hooks`
+        parameter).
+
+        Args:
+            hook: Hook to unregister.
+
+        Raises:
+            exceptions.InvalidValueException: When the hook is not registered.
+        """
+        if hook not in self._hooks:
+            raise exceptions.InvalidValueException("The hook is not registered.")
 
-        if add_uid:
-            uid = compat.message_uid(unix_time, microseconds)
+        self._hooks.remove(hook)
+
+    async def _get_queue_context(self, keys: _QueueKeys) -> _QueueContext:
+        instrumentation.round_trip()
+        result = await self._client.hmget(
+            keys.hash, [compat.VT, compat.DELAY, compat.MAX_SIZE]
+        )
+
+        if any([v is None for v in result]):
+            raise exceptions.QueueNotFoundException(
+                f"Queue '{keys.name}' does not exist."
+            )
 
         return _QueueContext(
-            vt=int(result[0][0]),
-            delay=int(result[0][1]),
-            max_size=int(result[0][2]),
-            ts=ts,
-            uid=uid,
+            vt=int(result[0]), delay=int(result[1]), max_size=int(result[2])
         )
 
+    @instrumentation.instrumented("create_queue")
     async def create_queue(
         self,
         queue_name: str,
@@ -244,8 +576,9 @@ class AIORSMQ:
         """
         self._validate(queue_name=queue_name, vt=vt, delay=delay, max_size=max_size)
 
-        key_hash = compat.queue_hash(self._ns, queue_name)
+        key_hash = self._queue_keys(queue_name).hash
         pipeline = self._client.pipeline()
+        instrumentation.round_trip()
         now = await self._client.time()
 
         pipeline.hsetnx(key_hash, compat.VT, vt)
@@ -254,6 +587,7 @@ class AIORSMQ:
         pipeline.hsetnx(key_hash, compat.CREATED, now[0])
         pipeline.hsetnx(key_hash, compat.MODIFIED, now[0])
 
+        instrumentation.round_trip()
         result = await pipeline.execute()
 
         if result[0] == 0:
@@ -261,8 +595,10 @@ class AIORSMQ:
                 f"Queue '{queue_name}' already exists."
             )
 
+        instrumentation.round_trip()
         await self._client.sadd(compat.queues_set(self._ns), queue_name)
 
+    @instrumentation.instrumented("list_queues")
     async def list_queues(self) -> List[str]:
         """Retrieve a list of all existing queues.
 
@@ -271,9 +607,11 @@ class AIORSMQ:
         Returns:
             List of queue names.
         """
-        queues = await self._client.smembers(compat.queues_set(self._ns))
+        instrumentation.round_trip()
+        queues = await self._read_client.smembers(compat.queues_set(self._ns))
         return list(queues)
 
+    @instrumentation.instrumented("delete_queue")
     async def delete_queue(self, queue_name: str) -> None:
         """Delete a message queue.
 
@@ -287,22 +625,47 @@ class AIORSMQ:
         """
         self._validate(queue_name=queue_name)
 
-        keys = [
-            compat.queue_sorted_set(self._ns, queue_name),
-            compat.queue_hash(self._ns, queue_name),
-        ]
+        keys = self._queue_keys(queue_name)
+
+        if self._hash_tags:
+            # The set of queues is stored in a different cluster slot than the
+            # queue's keys, so it cannot be modified in the same transaction
+            instrumentation.round_trip()
+            deleted = await self._client.delete(keys.sorted_set, keys.hash)
+            pipeline = self._client.pipeline(transaction=False)
+        else:
+            pipeline = self._client.pipeline()
+            pipeline.delete(keys.sorted_set, keys.hash)
 
-        pipeline = self._client.pipeline()
-        pipeline.delete(*keys)
         pipeline.srem(compat.queues_set(self._ns), queue_name)
 
+        instrumentation.round_trip()
         result = await pipeline.execute()
+        if not self._hash_tags:
+            deleted = result[0]
 
-        if result[0] == 0:
+        if self._offload_threshold is not None:
+            await self._delete_chunks(keys)
+
+        if deleted == 0:
             raise exceptions.QueueNotFoundException(
                 f"Queue '{queue_name}' does not exist."
             )
 
+    async def _delete_chunks(self, keys: _QueueKeys) -> None:
+        # Delete the chunks of all offloaded messages still stored in the queue
+        cursor = None
+        while cursor != 0:
+            instrumentation.round_trip()
+            cursor, chunk_keys = await self._client.scan(
+                cursor or 0, match=keys.chunks_prefix + "*"
+            )
+
+            if chunk_keys:
+                instrumentation.round_trip()
+                await self._client.delete(*chunk_keys)
+
+    @instrumentation.instrumented("get_queue_attributes")
     async def get_queue_attributes(self, queue_name: str) -> QueueAttributes:
         """Retrieve a message queue's attributes.
 
@@ -319,13 +682,20 @@ class AIORSMQ:
         """
         self._validate(queue_name=queue_name)
 
-        time = await self._client.time()
-        key_sorted_set = compat.queue_sorted_set(self._ns, queue_name)
-        key_hash = compat.queue_hash(self._ns, queue_name)
-        pipeline = self._client.pipeline()
+        return await self._get_queue_attributes(self._queue_keys(queue_name))
+
+    async def _get_queue_attributes(
+        self, keys: _QueueKeys, client: Optional[aioredis.Redis] = None
+    ) -> QueueAttributes:
+        if client is None:
+            client = self._read_client
+
+        instrumentation.round_trip()
+        time = await client.time()
+        pipeline = client.pipeline()
 
         pipeline.hmget(
-            key_hash,
+            keys.hash,
             compat.VT,
             compat.DELAY,
             compat.MAX_SIZE,
@@ -334,19 +704,20 @@ class AIORSMQ:
             compat.CREATED,
             compat.MODIFIED,
         )
-        pipeline.zcard(key_sorted_set)
+        pipeline.zcard(keys.sorted_set)
 
         # NOTE: The JavaScript implementation uses only `time[0] * 1000`, which
         # implies that sending a message and then retrieving queue attributes
         # within the same second might yield incorrect results.
         # Using `time[0] * 1000 + time[1] // 1000` would be ideal, but I will
         # stick to the original implementation.
-        pipeline.zcount(key_sorted_set, time[0] * 1000, "+inf")
+        pipeline.zcount(keys.sorted_set, time[0] * 1000, "+inf")
 
+        instrumentation.round_trip()
         result = await pipeline.execute()
         if result[0][0] is None:
             raise exceptions.QueueNotFoundException(
-                f"Queue '{queue_name}' does not exist."
+                f"Queue '{keys.name}' does not exist."
             )
 
         return QueueAttributes(
@@ -361,6 +732,7 @@ class AIORSMQ:
             hidden_messages=result[2],
         )
 
+    @instrumentation.instrumented("set_queue_attributes")
     async def set_queue_attributes(
         self,
         queue_name: str,
@@ -393,33 +765,70 @@ class AIORSMQ:
 
         self._validate(queue_name=queue_name, vt=vt, delay=delay, max_size=max_size)
 
-        # Check if the queue exists
-        await self._get_queue_context(queue_name)
+        return await self._set_queue_attributes(
+            self._queue_keys(queue_name), vt, delay, max_size
+        )
 
-        key_hash = compat.queue_hash(self._ns, queue_name)
+    async def _set_queue_attributes(
+        self,
+        keys: _QueueKeys,
+        vt: Optional[int],
+        delay: Optional[int],
+        max_size: Optional[int],
+    ) -> QueueAttributes:
+        # Check if the queue exists
+        await self._get_queue_context(keys)
 
+        instrumentation.round_trip()
         time = await self._client.time()
         pipeline = self._client.pipeline()
 
-        pipeline.hset(key_hash, compat.MODIFIED, time[0])
+        pipeline.hset(keys.hash, compat.MODIFIED, time[0])
         attributes = {compat.VT: vt, compat.DELAY: delay, compat.MAX_SIZE: max_size}
         for k, v in attributes.items():
             if v is not None:
-                pipeline.hset(key_hash, k, v)
+                pipeline.hset(keys.hash, k, v)
 
+        instrumentation.round_trip()
         await pipeline.execute()
 
-        return await self.get_queue_attributes(queue_name)
+        # Read the attributes from the same server they were written to
+        return await self._get_queue_attributes(keys, self._client)
+
+    def _contents_length_bytes(self, message: compat.Contents) -> int:
+        if isinstance(message, str):
+            return utils.encoded_length(message, self._client_encoding)
+
+        if isinstance(message, memoryview):
+            return message.nbytes
+
+        return len(message)
+
+    @staticmethod
+    def _byte_view(contents: Any) -> Any:
+        if isinstance(contents, bytearray):
+            return memoryview(contents)
+
+        if isinstance(contents, memoryview):
+            # The Redis client uses `len` as the length of the value, which is the
+            # number of items (not bytes) in views with multi-byte items.
+            if not contents.c_contiguous:
+                raise exceptions.InvalidValueException(
+                    "Memory views used as message contents must be contiguous."
+                )
+
+            return contents.cast("B")
 
-    def _contents_length_bytes(self, message: Union[str, bytes]) -> int:
-        return len(
-            message.encode(self._client_encoding)
-            if isinstance(message, str)
-            else message
+        return contents
+
+    def _decode(self, value: Union[str, bytes]) -> str:
+        return (
+            value.decode(self._client_encoding) if isinstance(value, bytes) else value
         )
 
+    @instrumentation.instrumented("send_message")
     async def send_message(
-        self, queue_name: str, contents: Union[str, bytes], delay: Optional[int] = None
+        self, queue_name: str, contents: Any, delay: Optional[int] = None
     ) -> str:
         """Send a message to a message queue.
 
@@ -429,7 +838,11 @@ class AIORSMQ:
                 configured with `decode_responses=True`, this parameter should be set to
                 an instance of `str`. Otherwise, `bytes` should be used. This will also
                 affect the contents of the message received when using `receive_message`
-                or `pop_message`.
+                or `pop_message`. Other bytes-like objects (`bytearray` and
+                contiguous `memoryview` objects) may also be used, and are sent
+                without being copied.
+                When a codec has been configured, any value supported by the codec may
+                be used instead.
             delay: Delay to apply when sending the message (in seconds). If not
                 specified, the queue's delay value will be used. The message will only
                 be receivable after the delay period has elapsed.
@@ -444,55 +857,306 @@ class AIORSMQ:
         """
         self._validate(queue_name=queue_name, delay=delay)
 
-        context = await self._get_queue_context(queue_name, add_uid=True)
-        delay = context.delay if delay is None else delay
+        return await self._send_message(self._queue_keys(queue_name), contents, delay)
 
-        if (
-            context.max_size != compat.MAX_SIZE_UNLIMITED
-            and self._contents_length_bytes(contents) > context.max_size
-        ):
+    @instrumentation.instrumented("send_messages")
+    async def send_messages(
+        self,
+        queue_name: str,
+        contents: List[Any],
+        delay: Union[None, int, List[Optional[int]]] = None,
+    ) -> List[str]:
+        """Send multiple messages to a message queue, using a single round trip to
+        Redis.
+
+        Either all messages are sent, or none of them are (for example, when one of
+        them exceeds the queue's maximum message size).
+
+        Args:
+            queue_name: Name of the message queue.
+            contents: Contents of the messages to send. See `send_message` for more
+                details on which type to use.
+            delay: Delay to apply when sending the messages (in seconds). Either a
+                single value to use for all messages, or a list containing one value
+                per message. If not specified (or if a list element is `None`), the
+                queue's delay value will be used.
+
+        Raises:
+            exceptions.QueueNotFoundException: When the specified queue does not exist.
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
+
+        Returns:
+            Unique IDs of the messages sent, in the same order as `contents`.
+        """
+        self._validate(queue_name=queue_name)
+        delays = self._validate_delays(contents, delay)
+
+        if not contents:
+            return []
+
+        return await self._send_messages(self._queue_keys(queue_name), contents, delays)
+
+    @classmethod
+    def _validate_delays(
+        cls,
+        contents: List[Any],
+        delay: Union[None, int, List[Optional[int]]],
+    ) -> List[Optional[int]]:
+        if isinstance(delay, list):
+            if len(delay) != len(contents):
+                raise exceptions.InvalidValueException(
+                    "The number of delays does not match the number of messages."
+                )
+
+            delays = delay
+        else:
+            delays = [delay] * len(contents)
+
+        for d in set(delays):
+            cls._validate(delay=d)
+
+        return delays
+
+    async def _send_message(
+        self, keys: _QueueKeys, contents: Any, delay: Optional[int]
+    ) -> str:
+        if not self._hooks:
+            return await self._submit_message(keys, contents, delay)
+
+        contents = hooks.before_send(self._hooks, keys.name, [contents])[0]
+        try:
+            uid = await self._submit_message(keys, contents, delay)
+        except Exception as e:
+            hooks.on_error(self._hooks, keys.name, "send", e)
+            raise
+
+        hooks.after_send(self._hooks, keys.name, [contents], [uid])
+        return uid
+
+    async def _submit_message(
+        self, keys: _QueueKeys, contents: Any, delay: Optional[int]
+    ) -> str:
+        # Encode the contents before coalescing them with other calls, so that
+        # contents that cannot be encoded only make this call fail.
+        encoded = self._encode_contents([contents])
+        if self._send_batcher is not None:
+            return await self._send_batcher.submit(keys, (encoded[0], delay))
+
+        uids = await self._write_encoded_messages(keys, encoded, [delay])
+        return uids[0]
+
+    async def _send_message_batch(
+        self, keys: _QueueKeys, items: List[Tuple[Any, Optional[int]]]
+    ) -> List[Union[str, BaseException]]:
+        contents = [c for c, _ in items]
+        delays = [d for _, d in items]
+
+        try:
+            return list(await self._write_encoded_messages(keys, contents, delays))
+        except exceptions.InvalidValueException:
+            # At least one of the messages is too large, which caused the whole batch
+            # to be rejected. Send the messages separately so that only the senders
+            # of the offending messages receive the exception.
+            results = await asyncio.gather(
+                *[self._write_encoded_messages(keys, [c], [d]) for c, d in items],
+                return_exceptions=True,
+            )
+            return [r if isinstance(r, BaseException) else r[0] for r in results]
+
+    async def _send_messages(
+        self,
+        keys: _QueueKeys,
+        contents: List[Any],
+        delays: List[Optional[int]],
+    ) -> List[str]:
+        if not self._hooks:
+            return await self._write_messages(keys, contents, delays)
+
+        contents = hooks.before_send(self._hooks, keys.name, contents)
+        try:
+            uids = await self._write_messages(keys, contents, delays)
+        except Exception as e:
+            hooks.on_error(self._hooks, keys.name, "send", e)
+            raise
+
+        hooks.after_send(self._hooks, keys.name, contents, uids)
+        return uids
+
+    async def _write_messages(
+        self,
+        keys: _QueueKeys,
+        contents: List[Any],
+        delays: List[Optional[int]],
+    ) -> List[str]:
+        return await self._write_encoded_messages(
+            keys, self._encode_contents(contents), delays
+        )
+
+    def _encode_contents(self, contents: List[Any]) -> List[compat.Contents]:
+        if self._codec is not None:
+            contents = [self._codec.encode(c) for c in contents]
+
+        # The Redis client does not accept `bytearray` objects, but it accepts
+        # memory views, which are sent without copying them.
+        return [self._byte_view(c) for c in contents]
+
+    async def _write_encoded_messages(
+        self,
+        keys: _QueueKeys,
+        contents: List[compat.Contents],
+        delays: List[Optional[int]],
+    ) -> List[str]:
+        suffixes = [compat.message_uid_suffix() for _ in contents]
+        chunks: Dict[str, List[memoryview]] = {}
+        if self._offload_threshold is not None:
+            # Offloaded messages are replaced by references, so they are not subject
+            # to the queue's maximum message size.
+            contents = self._offload_contents(keys, contents, suffixes, chunks)
+
+        real_time = self._real_time
+        if real_time and self._throttle is not None:
+            real_time = self._throttle.acquire(keys.rt, keys.sorted_set)
+
+        args: List[Union[compat.Contents, int]] = [int(real_time), keys.rt]
+        for c, d, suffix in zip(contents, delays, suffixes):
+            args.extend((suffix, "" if d is None else d, c))
+
+        result: scripts.MsgSendBatch
+        if not chunks:
+            instrumentation.round_trip()
+            result = await self._script_send_messages(
+                keys=[keys.sorted_set, keys.hash], args=args
+            )
+        else:
+            # Store the chunks and the messages atomically
+            pipeline = self._client.pipeline()
+            for key, key_chunks in chunks.items():
+                pipeline.rpush(key, *key_chunks)
+
+            await self._script_send_messages(
+                keys=[keys.sorted_set, keys.hash], args=args, client=pipeline
+            )
+
+            try:
+                instrumentation.round_trip()
+                result = (await pipeline.execute())[-1]
+            except BaseException:
+                instrumentation.round_trip()
+                await self._client.delete(*chunks)
+                raise
+
+            if result is None or isinstance(result, int):
+                instrumentation.round_trip()
+                await self._client.delete(*chunks)
+
+        if result is None:
+            raise exceptions.QueueNotFoundException(
+                f"Queue '{keys.name}' does not exist."
+            )
+
+        if isinstance(result, int):
             raise exceptions.InvalidValueException(
-                f"The maximum message length in bytes is {context.max_size}."
+                f"The maximum message length in bytes is {result}."
             )
 
-        key_sorted_set = compat.queue_sorted_set(self._ns, queue_name)
-        key_hash = compat.queue_hash(self._ns, queue_name)
+        return [self._decode(uid) for uid in result]
 
-        pipeline = self._client.pipeline()
+    def _offload_contents(
+        self,
+        keys: _QueueKeys,
+        contents: List[Any],
+        suffixes: List[str],
+        chunks: Dict[str, List[memoryview]],
+    ) -> List[Any]:
+        assert self._offload_threshold is not None
+
+        result = []
+        for c, suffix in zip(contents, suffixes):
+            if self._contents_length_bytes(c) <= self._offload_threshold:
+                result.append(c)
+                continue
+
+            text = isinstance(c, str)
+            data = c.encode(self._client_encoding) if text else c
+            key = keys.chunks_prefix + suffix
+
+            chunks[key] = offload.split(
+                data,
+                self._offload_chunk_size,
+                self._client_encoding if text else None,
+            )
+            result.append(offload.reference(key, len(chunks[key])))
 
-        pipeline.zadd(
-            key_sorted_set, {utils.ensure(context.uid): context.ts + delay * 1000}
-        )
-        pipeline.hset(key_hash, context.uid, contents)
-        pipeline.hincrby(key_hash, compat.TOTAL_SENT, 1)
+        return result
 
-        if self._real_time:
-            pipeline.zcard(key_sorted_set)
+    async def _fetch_offloaded(
+        self, messages: List[Message], delete: bool
+    ) -> List[Message]:
+        offloaded = []
+        for message in messages:
+            reference = offload.parse_reference(
+                message._contents, self._client_encoding
+            )
+            if reference is not None:
+                offloaded.append((message, reference))
 
-        result = await pipeline.execute()
+        if not offloaded:
+            return messages
 
-        if self._real_time:
-            await self._client.publish(compat.queue_rt(self._ns, queue_name), result[3])
+        if self._offload_stream:
+            for message, (key, count) in offloaded:
+                message._offload = (self._client, key, count, delete)
 
-        return utils.ensure(context.uid)
+            return messages
 
-    @staticmethod
-    def _message_from_script_result(result: scripts.MsgRecv) -> Message:
+        pipeline = self._client.pipeline()
+        for _, (key, _) in offloaded:
+            pipeline.lrange(key, 0, -1)
+            if delete:
+                pipeline.delete(key)
+
+        instrumentation.round_trip()
+        results = await pipeline.execute()
+        if delete:
+            results = results[::2]
+
+        missing = set()
+        for (message, (_, count)), chunks in zip(offloaded, results):
+            if len(chunks) == count:
+                message._contents = offload.join(chunks)
+            else:
+                # The message was deleted after it was received
+                missing.add(message.id)
+
+        return [m for m in messages if m.id not in missing]
+
+    async def _publish_queue_size(self, channel: str, key_sorted_set: str) -> None:
+        await self._script_publish_queue_size(
+            keys=[key_sorted_set], args=[channel], client=self._pubsub_client
+        )
+
+    def _message_from_script_result(self, result: scripts.MsgRecv) -> Message:
         return Message(
             contents=result[1],
             id=result[0],
-            fr=int(result[3]),
+            fr=result[3],
             rc=result[2],
-            sent=compat.base36_decode(result[0][:10]) / 1000,
+            codec=self._codec,
+            encoding=self._client_encoding,
         )
 
+    @instrumentation.instrumented("receive_message", polling=True)
     async def receive_message(
-        self, queue_name: str, vt: Optional[int] = None
+        self,
+        queue_name: str,
+        vt: Optional[int] = None,
+        wait_time: Optional[float] = None,
     ) -> Optional[Message]:
         """Receive a message from a message queue.
 
-        **Note**: This method will return `None` immediately if the message queue is
-        empty.
+        **Note**: Unless `wait_time` is specified, this method will return `None`
+        immediately if the message queue is empty.
 
         After receiving a message and successfully processing it, make sure to call
         `delete_message` to ensure you won't receive it again in the future.
@@ -503,6 +1167,12 @@ class AIORSMQ:
                 specified, the queue's visiblity timer value will be used. After the
                 message has been received, it will be invisible to consumers until the
                 duration visiblity timer period has elapsed.
+            wait_time: Maximum time to wait for a message when the queue is empty (in
+                seconds). While waiting, the method will be notified of new messages
+                sent by clients that have real time mode enabled. Messages that become
+                visible for other reasons (e.g. their delay has elapsed) are checked
+                for once per second. A single pub/sub connection is shared among all
+                waiting coroutines.
 
         Raises:
             exceptions.QueueNotFoundException: When the specified queue does not exist.
@@ -513,20 +1183,178 @@ class AIORSMQ:
             Message received from the message queue if one was present, `None`
             otherwise.
         """
-        self._validate(queue_name=queue_name, vt=vt)
+        self._validate(queue_name=queue_name, vt=vt, wait_time=wait_time)
+
+        messages = await self._receive_messages(
+            self._queue_keys(queue_name), 1, vt, wait_time
+        )
+        return messages[0] if messages else None
+
+    @instrumentation.instrumented("receive_messages", polling=True)
+    async def receive_messages(
+        self,
+        queue_name: str,
+        count: int,
+        vt: Optional[int] = None,
+        wait_time: Optional[float] = None,
+    ) -> List[Message]:
+        """Receive up to `count` messages from a message queue, using a single round
+        trip to Redis.
+
+        **Note**: Unless `wait_time` is specified, this method will return an empty
+        list immediately if the message queue is empty.
+
+        Messages are returned in the same order `receive_message` would have returned
+        them. Each message must be deleted separately after it has been processed.
+
+        Args:
+            queue_name: Name of the message queue.
+            count: Maximum number of messages to receive.
+            vt: Visibility timer to use when receving the messages (in seconds). If
+                not specified, the queue's visiblity timer value will be used.
+            wait_time: Maximum time to wait for messages when the queue is empty (in
+                seconds). See `receive_message` for more details.
+
+        Raises:
+            exceptions.QueueNotFoundException: When the specified queue does not exist.
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
+
+        Returns:
+            List of messages received from the message queue.
+        """
+        self._validate(queue_name=queue_name, vt=vt, count=count, wait_time=wait_time)
 
-        context = await self._get_queue_context(queue_name)
-        key_sorted_set = compat.queue_sorted_set(self._ns, queue_name)
-        vt = context.vt if vt is None else vt
+        return await self._receive_messages(
+            self._queue_keys(queue_name), count, vt, wait_time
+        )
 
-        result: scripts.MsgRecv = await self._script_receive_message(
-            keys=[key_sorted_set, str(context.ts), str(context.ts + vt * 1000)]
+    async def _receive_messages(
+        self,
+        keys: _QueueKeys,
+        count: int,
+        vt: Optional[int],
+        wait_time: Optional[float] = None,
+    ) -> List[Message]:
+        receive = self._poll_messages(keys, count, vt, wait_time)
+        if not self._hooks:
+            return await receive
+
+        return await self._call_receive_hooks(keys, "receive", receive)
+
+    async def _call_receive_hooks(
+        self, keys: _QueueKeys, operation: str, receive: Awaitable[List[Message]]
+    ) -> List[Message]:
+        try:
+            messages = await receive
+        except Exception as e:
+            hooks.on_error(self._hooks, keys.name, operation, e)
+            raise
+
+        hooks.after_receive(self._hooks, keys.name, messages)
+        return messages
+
+    async def _poll_messages(
+        self,
+        keys: _QueueKeys,
+        count: int,
+        vt: Optional[int],
+        wait_time: Optional[float],
+    ) -> List[Message]:
+        messages = await self._claim_messages(keys, count, vt)
+        if messages or not wait_time:
+            return messages
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + wait_time
+        channel = keys.rt
+        event = asyncio.Event()
+
+        def notify(data: Union[str, bytes]) -> None:
+            event.set()
+
+        await self._listener.subscribe(channel, notify)
+
+        try:
+            while True:
+                # Clear the event before checking the queue, so that notifications
+                # published in the meantime are not lost.
+                event.clear()
+
+                messages = await self._claim_messages(keys, count, vt)
+                remaining = deadline - loop.time()
+                if messages or remaining <= 0:
+                    return messages
+
+                try:
+                    await asyncio.wait_for(
+                        event.wait(), min(remaining, _WAIT_POLL_INTERVAL)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._listener.unsubscribe(channel, notify)
+
+    async def _claim_messages(
+        self, keys: _QueueKeys, count: int, vt: Optional[int]
+    ) -> List[Message]:
+        instrumentation.round_trip()
+        result: Optional[scripts.MsgRecvBatch] = await self._script_receive_messages(
+            keys=[keys.sorted_set, keys.hash], args=["" if vt is None else vt, count]
         )
-        if not result:
-            return None
+        if result is None:
+            raise exceptions.QueueNotFoundException(
+                f"Queue '{keys.name}' does not exist."
+            )
+
+        messages = [self._message_from_script_result(r) for r in result]
+        if self._offload_threshold is not None:
+            messages = await self._fetch_offloaded(messages, delete=False)
+
+        return messages
+
+    def consume(
+        self,
+        queue_name: str,
+        prefetch: int = 10,
+        vt: Optional[int] = None,
+        max_backoff: float = 5.0,
+    ) -> consumer.MessageIterator:
+        """Iterate over the messages of a message queue, using `async for`.
+
+        Messages are received in batches in the background, and kept in a local
+        buffer until the iterator returns them. When the queue is empty, the time
+        waited between receives grows exponentially up to `max_backoff` (new
+        messages sent by clients with real time mode enabled are received
+        immediately, see `receive_message`'s `wait_time` parameter).
+
+        **Note**: The visibility timer of a message starts running as soon as it is
+        placed in the local buffer, not when it is returned by the iterator.
+
+        As with `receive_message`, messages must be deleted after being processed.
+        Calling `close` on the iterator (or using it with `async with`) stops the
+        background receives and makes buffered messages visible again.
+
+        Args:
+            queue_name: Name of the message queue.
+            prefetch: Maximum number of messages to keep in the local buffer.
+            vt: Visibility timer to use when receving messages (in seconds). If not
+                specified, the queue's visiblity timer value will be used.
+            max_backoff: Maximum time to wait between receives when the queue is
+                empty (in seconds).
+
+        Raises:
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
 
-        return self._message_from_script_result(result)
+        Returns:
+            Asynchronous iterator over the messages of the queue. Errors raised while
+            receiving messages (e.g. `exceptions.QueueNotFoundException`) are raised
+            by the iterator.
+        """
+        return self.queue(queue_name).consume(prefetch, vt, max_backoff)
 
+    @instrumentation.instrumented("delete_message")
     async def delete_message(self, queue_name: str, id: str) -> None:
         """Delete a message from a message queue.
 
@@ -543,19 +1371,88 @@ class AIORSMQ:
         """
         self._validate(queue_name=queue_name, id=id)
 
-        key_sorted_set = compat.queue_sorted_set(self._ns, queue_name)
-        key_hash = compat.queue_hash(self._ns, queue_name)
-        pipeline = self._client.pipeline()
+        await self._delete_message(self._queue_keys(queue_name), id)
 
-        pipeline.zrem(key_sorted_set, id)
-        pipeline.hdel(key_hash, id, compat.message_rc(id), compat.message_fr(id))
+    async def _delete_message(self, keys: _QueueKeys, id: str) -> None:
+        if self._delete_batcher is not None:
+            deleted = await self._delete_batcher.submit(keys, id)
+        else:
+            pipeline = self._client.pipeline()
 
-        result = await pipeline.execute()
-        if result[0] == 0 or result[1] == 0:
+            pipeline.zrem(keys.sorted_set, id)
+            pipeline.hdel(keys.hash, id, compat.message_rc(id), compat.message_fr(id))
+            if self._offload_threshold is not None:
+                pipeline.delete(offload.chunks_key(keys.chunks_prefix, id))
+
+            instrumentation.round_trip()
+            result = await pipeline.execute()
+            deleted = result[0] != 0 and result[1] != 0
+
+        if not deleted:
             raise exceptions.MessageNotFoundException(
                 f"Message with ID '{id}' does not exist."
             )
 
+    async def _delete_message_batch(
+        self, keys: _QueueKeys, ids: List[str]
+    ) -> List[Union[bool, BaseException]]:
+        deleted = await self._delete_messages(keys, ids)
+
+        # `deleted` preserves the order of `ids`. If an ID appears more than once,
+        # only its first occurrence is considered to have been deleted.
+        results: List[Union[bool, BaseException]] = []
+        i = 0
+        for id in ids:
+            found = i < len(deleted) and deleted[i] == id
+            results.append(found)
+            i += found
+
+        return results
+
+    @instrumentation.instrumented("delete_messages")
+    async def delete_messages(self, queue_name: str, ids: List[str]) -> List[str]:
+        """Delete multiple messages from a message queue, using a single round trip
+        to Redis.
+
+        Unlike `delete_message`, no exception is raised when a message does not exist.
+
+        Args:
+            queue_name: Name of the message queue containing the messages.
+            ids: Unique IDs of the messages to delete.
+
+        Raises:
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
+
+        Returns:
+            IDs of the messages that were deleted, in the same order as `ids`.
+        """
+        self._validate(queue_name=queue_name)
+        for id in ids:
+            self._validate(id=id)
+
+        return await self._delete_messages(self._queue_keys(queue_name), ids)
+
+    async def _delete_messages(self, keys: _QueueKeys, ids: List[str]) -> List[str]:
+        if not ids:
+            return []
+
+        pipeline = self._client.pipeline()
+
+        fields: List[str] = []
+        for id in ids:
+            pipeline.zrem(keys.sorted_set, id)
+            fields.extend((id, compat.message_rc(id), compat.message_fr(id)))
+
+        pipeline.hdel(keys.hash, *fields)
+        if self._offload_threshold is not None:
+            pipeline.delete(*[offload.chunks_key(keys.chunks_prefix, id) for id in ids])
+
+        instrumentation.round_trip()
+        result = await pipeline.execute()
+        return [id for id, removed in zip(ids, result) if removed]
+
+    @instrumentation.instrumented("pop_message", polling=True)
     async def pop_message(self, queue_name: str) -> Optional[Message]:
         """Receive a message from a message queue and delete it from the queue.
 
@@ -581,17 +1478,65 @@ class AIORSMQ:
         """
         self._validate(queue_name=queue_name)
 
-        context = await self._get_queue_context(queue_name)
-        key_sorted_set = compat.queue_sorted_set(self._ns, queue_name)
+        messages = await self._pop_messages(self._queue_keys(queue_name), 1)
+        return messages[0] if messages else None
+
+    @instrumentation.instrumented("pop_messages", polling=True)
+    async def pop_messages(self, queue_name: str, count: int) -> List[Message]:
+        """Receive up to `count` messages from a message queue and delete them from
+        the queue, using a single round trip to Redis.
+
+        **Note**: This method will return an empty list immediately if the message
+        queue is empty.
+
+        The same caveats described in `pop_message` apply to this method.
+
+        Args:
+            queue_name: Name of the message queue.
+            count: Maximum number of messages to receive.
+
+        Raises:
+            exceptions.QueueNotFoundException: When the specified queue does not exist.
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
+
+        Returns:
+            List of messages received from the message queue.
+        """
+        self._validate(queue_name=queue_name, count=count)
+
+        return await self._pop_messages(self._queue_keys(queue_name), count)
+
+    async def _pop_messages(self, keys: _QueueKeys, count: int) -> List[Message]:
+        pop = self._take_messages(keys, count)
+        if not self._hooks:
+            return await pop
 
-        result: scripts.MsgRecv = await self._script_pop_message(
-            keys=[key_sorted_set, str(context.ts)]
+        return await self._call_receive_hooks(keys, "pop", pop)
+
+    async def _take_messages(self, keys: _QueueKeys, count: int) -> List[Message]:
+        args: List[Union[str, int]] = [count]
+        if self._offload_threshold is not None:
+            # The chunks of popped messages are kept for a while, so that they can
+            # be read after the messages have been deleted.
+            args.extend((offload.MARKER, offload.POP_TTL))
+
+        instrumentation.round_trip()
+        result: Optional[scripts.MsgRecvBatch] = await self._script_pop_messages(
+            keys=[keys.sorted_set, keys.hash], args=args
         )
-        if not result:
-            return None
+        if result is None:
+            raise exceptions.QueueNotFoundException(
+                f"Queue '{keys.name}' does not exist."
+            )
+
+        messages = [self._message_from_script_result(r) for r in result]
+        if self._offload_threshold is not None:
+            messages = await self._fetch_offloaded(messages, delete=True)
 
-        return self._message_from_script_result(result)
+        return messages
 
+    @instrumentation.instrumented("change_message_visibility")
     async def change_message_visibility(
         self, queue_name: str, id: str, vt: int
     ) -> None:
@@ -613,22 +1558,239 @@ class AIORSMQ:
         """
         self._validate(queue_name=queue_name, vt=vt, id=id)
 
-        context = await self._get_queue_context(queue_name)
-        key_sorted_set = compat.queue_sorted_set(self._ns, queue_name)
+        if await self._change_messages_visibility(
+            self._queue_keys(queue_name), {id: vt}
+        ):
+            raise exceptions.MessageNotFoundException(
+                f"Message with ID '{id}' does not exist."
+            )
+
+    @instrumentation.instrumented("change_messages_visibility")
+    async def change_messages_visibility(
+        self, queue_name: str, vts: Dict[str, int]
+    ) -> List[str]:
+        """Change the visibility timer of multiple messages, using a single round trip
+        to Redis.
+
+        Unlike `change_message_visibility`, no exception is raised when a message does
+        not exist.
 
-        result: scripts.MsgVisibility = await self._script_change_message_visibility(
-            keys=[key_sorted_set, id, str(context.ts + vt * 1000)]
+        Args:
+            queue_name: Name of the message queue containing the messages.
+            vts: Mapping of message IDs to the new visibility timer value to set for
+                each of them (in seconds). See `change_message_visibility` for more
+                details.
+
+        Raises:
+            exceptions.QueueNotFoundException: When the specified queue does not exist.
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
+
+        Returns:
+            IDs of the messages that do not exist (and so could not be updated).
+        """
+        self._validate(queue_name=queue_name)
+        for id, vt in vts.items():
+            self._validate(id=id, vt=vt)
+
+        return await self._change_messages_visibility(self._queue_keys(queue_name), vts)
+
+    async def _change_messages_visibility(
+        self, keys: _QueueKeys, vts: Dict[str, int]
+    ) -> List[str]:
+        args: List[Union[str, int]] = []
+        for id, vt in vts.items():
+            args.extend((id, vt))
+
+        instrumentation.round_trip()
+        result: scripts.MsgVisibilityBatch = (
+            await self._script_change_messages_visibility(
+                keys=[keys.sorted_set, keys.hash], args=args
+            )
         )
 
-        if result == 0:
-            raise exceptions.MessageNotFoundException(
-                f"Message with ID '{id}' does not exist."
+        if result is None:
+            raise exceptions.QueueNotFoundException(
+                f"Queue '{keys.name}' does not exist."
             )
 
+        return [self._decode(id) for id in result]
+
     async def quit(self) -> None:
         """Close the connection to the Redis server.
 
         Internally, this methods just calls the `close` method of the Redis
-        client object specified in the initializator.
+        client objects specified in the initializator (after sending or deleting any
+        messages pending because of `send_batch_delay` or `delete_batch_delay`,
+        publishing notifications pending because of `real_time_interval`, and
+        closing the pub/sub connection used for `wait_time`, if any).
+        """
+        if self._send_batcher is not None:
+            await self._send_batcher.close()
+
+        if self._delete_batcher is not None:
+            await self._delete_batcher.close()
+
+        if self._throttle is not None:
+            await self._throttle.close()
+
+        await self._listener.close()
+
+        for client in {self._client, self._read_client, self._pubsub_client}:
+            await client.close()
+
+
+class Queue:
+    """Handle for a message queue, bound to an `AIORSMQ` object.
+
+    Use `AIORSMQ.queue` to create instances of this class. Each method is equivalent
+    to the `AIORSMQ` method with the same description, minus the `queue_name`
+    parameter, which has already been validated.
+    """
+
+    __slots__ = ["_rsmq", "_keys", "_metrics"]
+
+    def __init__(self, *, rsmq: AIORSMQ, keys: _QueueKeys) -> None:
+        """Initialize a `Queue` object.
+
+        **Note:** This description is provided only for documentation purposes - users
+        of `aiorsmq` have no need for creating `Queue` objects manually.
+
+        Args:
+            rsmq: `AIORSMQ` object to use for accessing the queue.
+            keys: Redis keys used by the queue.
         """
-        await self._client.close()
+        self._rsmq = rsmq
+        self._keys = keys
+        self._metrics = rsmq._metrics
+
+    @property
+    def name(self) -> str:
+        """Name of the message queue."""
+        return self._keys.name
+
+    @instrumentation.instrumented("get_queue_attributes")
+    async def get_attributes(self) -> QueueAttributes:
+        """See `AIORSMQ.get_queue_attributes`."""
+        return await self._rsmq._get_queue_attributes(self._keys)
+
+    @instrumentation.instrumented("set_queue_attributes")
+    async def set_attributes(
+        self,
+        vt: Optional[int] = None,
+        delay: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> QueueAttributes:
+        """See `AIORSMQ.set_queue_attributes`."""
+        if vt is None and delay is None and max_size is None:
+            raise exceptions.NoAttributesSpecified(
+                "At least one queue attribute must be specified."
+            )
+
+        AIORSMQ._validate(vt=vt, delay=delay, max_size=max_size)
+
+        return await self._rsmq._set_queue_attributes(self._keys, vt, delay, max_size)
+
+    @instrumentation.instrumented("send_message")
+    async def send(self, contents: Any, delay: Optional[int] = None) -> str:
+        """See `AIORSMQ.send_message`."""
+        AIORSMQ._validate(delay=delay)
+
+        return await self._rsmq._send_message(self._keys, contents, delay)
+
+    @instrumentation.instrumented("send_messages")
+    async def send_many(
+        self,
+        contents: List[Any],
+        delay: Union[None, int, List[Optional[int]]] = None,
+    ) -> List[str]:
+        """See `AIORSMQ.send_messages`."""
+        delays = AIORSMQ._validate_delays(contents, delay)
+
+        if not contents:
+            return []
+
+        return await self._rsmq._send_messages(self._keys, contents, delays)
+
+    @instrumentation.instrumented("receive_message", polling=True)
+    async def receive(
+        self, vt: Optional[int] = None, wait_time: Optional[float] = None
+    ) -> Optional[Message]:
+        """See `AIORSMQ.receive_message`."""
+        AIORSMQ._validate(vt=vt, wait_time=wait_time)
+
+        messages = await self._rsmq._receive_messages(self._keys, 1, vt, wait_time)
+        return messages[0] if messages else None
+
+    @instrumentation.instrumented("receive_messages", polling=True)
+    async def receive_many(
+        self,
+        count: int,
+        vt: Optional[int] = None,
+        wait_time: Optional[float] = None,
+    ) -> List[Message]:
+        """See `AIORSMQ.receive_messages`."""
+        AIORSMQ._validate(vt=vt, count=count, wait_time=wait_time)
+
+        return await self._rsmq._receive_messages(self._keys, count, vt, wait_time)
+
+    def consume(
+        self, prefetch: int = 10, vt: Optional[int] = None, max_backoff: float = 5.0
+    ) -> consumer.MessageIterator:
+        """See `AIORSMQ.consume`."""
+        AIORSMQ._validate(vt=vt, count=prefetch)
+
+        if max_backoff <= 0:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for max_backoff parameter."
+            )
+
+        return consumer.MessageIterator(
+            queue=self, prefetch=prefetch, vt=vt, max_backoff=max_backoff
+        )
+
+    @instrumentation.instrumented("delete_message")
+    async def delete(self, id: str) -> None:
+        """See `AIORSMQ.delete_message`."""
+        AIORSMQ._validate(id=id)
+
+        await self._rsmq._delete_message(self._keys, id)
+
+    @instrumentation.instrumented("delete_messages")
+    async def delete_many(self, ids: List[str]) -> List[str]:
+        """See `AIORSMQ.delete_messages`."""
+        for id in ids:
+            AIORSMQ._validate(id=id)
+
+        return await self._rsmq._delete_messages(self._keys, ids)
+
+    @instrumentation.instrumented("pop_message", polling=True)
+    async def pop(self) -> Optional[Message]:
+        """See `AIORSMQ.pop_message`."""
+        messages = await self._rsmq._pop_messages(self._keys, 1)
+        return messages[0] if messages else None
+
+    @instrumentation.instrumented("pop_messages", polling=True)
+    async def pop_many(self, count: int) -> List[Message]:
+        """See `AIORSMQ.pop_messages`."""
+        AIORSMQ._validate(count=count)
+
+        return await self._rsmq._pop_messages(self._keys, count)
+
+    @instrumentation.instrumented("change_message_visibility")
+    async def change_visibility(self, id: str, vt: int) -> None:
+        """See `AIORSMQ.change_message_visibility`."""
+        AIORSMQ._validate(vt=vt, id=id)
+
+        if await self._rsmq._change_messages_visibility(self._keys, {id: vt}):
+            raise exceptions.MessageNotFoundException(
+                f"Message with ID '{id}' does not exist."
+            )
+
+    @instrumentation.instrumented("change_messages_visibility")
+    async def change_visibility_many(self, vts: Dict[str, int]) -> List[str]:
+        """See `AIORSMQ.change_messages_visibility`."""
+        for id, vt in vts.items():
+            AIORSMQ._validate(id=id, vt=vt)
+
+        return await self._rsmq._change_messages_visibility(self._keys, vts)
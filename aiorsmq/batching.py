@@ -0,0 +1,108 @@
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+    TYPE_CHECKING,
+)
+import asyncio
+
+if TYPE_CHECKING:
+    from aiorsmq.aiorsmq import _QueueKeys
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Receives the items of a batch, and returns one result per item. Results may be
+# exceptions, which are then raised for the corresponding item only.
+Execute = Callable[["_QueueKeys", List[T]], Awaitable[List[Union[R, BaseException]]]]
+
+
+class _Batch(Generic[T, R]):
+    __slots__ = ["keys", "items", "futures", "timer"]
+
+    def __init__(self, keys: "_QueueKeys") -> None:
+        self.keys = keys
+        self.items: List[T] = []
+        self.futures: List["asyncio.Future[R]"] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class Batcher(Generic[T, R]):
+    """Coalesces operations submitted concurrently for the same queue, so that they
+    are executed using a single round trip to Redis.
+
+    Items are accumulated for up to `max_delay` seconds after the first item of a
+    batch was submitted, or until `max_size` items have been submitted, whichever
+    happens first. Each submitter then receives the result for its own item (or the
+    exception raised while executing the batch).
+    """
+
+    def __init__(
+        self, *, execute: Execute[T, R], max_size: int, max_delay: float
+    ) -> None:
+        self._execute = execute
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._batches: Dict[str, _Batch[T, R]] = {}
+        self._tasks: Set["asyncio.Future[None]"] = set()
+
+    async def submit(self, keys: "_QueueKeys", item: T) -> R:
+        loop = asyncio.get_event_loop()
+        batch = self._batches.get(keys.name)
+
+        if batch is None:
+            batch = _Batch(keys)
+            batch.timer = loop.call_later(self._max_delay, self._flush, keys.name)
+            self._batches[keys.name] = batch
+
+        future: "asyncio.Future[R]" = loop.create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+
+        if len(batch.items) >= self._max_size:
+            self._flush(keys.name)
+
+        # If the caller is cancelled, the item will still be executed
+        return await future
+
+    def _flush(self, queue_name: str) -> None:
+        batch = self._batches.pop(queue_name, None)
+        if batch is None:
+            return
+
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        task = asyncio.ensure_future(self._execute_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute_batch(self, batch: _Batch[T, R]) -> None:
+        try:
+            results = await self._execute(batch.keys, batch.items)
+        except Exception as e:
+            results = [e] * len(batch.futures)
+
+        for future, result in zip(batch.futures, results):
+            if future.done():
+                continue
+
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Execute all pending items immediately, and wait until they have been
+        executed.
+        """
+        for queue_name in list(self._batches):
+            self._flush(queue_name)
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,139 @@
+from typing import Any, Optional, Union
+import json
+import zlib
+
+from aiorsmq import exceptions
+
+# Prefixes used by `ZlibCodec` to indicate whether a payload was compressed.
+_RAW = b"r"
+_COMPRESSED = b"z"
+
+
+class Codec:
+    """Base class for codecs, which convert message contents to the values stored
+    in Redis, and back.
+
+    See the `codec` parameter of `AIORSMQ` for more details.
+    """
+
+    def encode(self, value: Any) -> Union[str, bytes]:
+        """Convert message contents to the value that will be stored in Redis.
+
+        Args:
+            value: Message contents, as passed to `AIORSMQ.send_message`.
+
+        Returns:
+            Value to store in Redis.
+        """
+        raise NotImplementedError
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        """Convert a value stored in Redis back to message contents.
+
+        Args:
+            data: Value stored in Redis, as returned by the Redis client.
+
+        Returns:
+            Message contents.
+        """
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    """Serializes message contents using JSON."""
+
+    def __init__(self, *, encoding: str = "utf-8") -> None:
+        """Initialize a `JSONCodec` object.
+
+        Args:
+            encoding: Encoding to use for the serialized JSON documents.
+        """
+        self._encoding = encoding
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode(self._encoding)
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        if isinstance(data, bytes):
+            data = data.decode(self._encoding)
+
+        return json.loads(data)
+
+
+class ZlibCodec(Codec):
+    """Compresses message contents using zlib, optionally after serializing them
+    using another codec.
+
+    Only payloads of at least `threshold` bytes are compressed, as compressing small
+    payloads usually does not reduce their size. A one byte prefix is added to every
+    payload to indicate whether it was compressed or not.
+
+    **Note:** Compressed payloads are binary, so the Redis client must not be
+    configured with `decode_responses=True` when using this codec.
+    """
+
+    def __init__(
+        self,
+        codec: Optional[Codec] = None,
+        *,
+        threshold: int = 1024,
+        level: int = -1,
+        encoding: str = "utf-8",
+    ) -> None:
+        """Initialize a `ZlibCodec` object.
+
+        Args:
+            codec: Codec to use for serializing message contents before compressing
+                them (e.g. `JSONCodec`). If not specified, message contents must be
+                instances of `str` or `bytes`, and they will be received as `bytes`.
+            threshold: Minimum payload size to compress (in bytes).
+            level: zlib compression level, from 0 to 9 (or -1 for zlib's default).
+            encoding: Encoding to use for contents that are instances of `str`.
+
+        Raises:
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
+        """
+        if threshold < 0:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for threshold parameter."
+            )
+
+        if not (-1 <= level <= 9):
+            raise exceptions.InvalidValueException(
+                "Incorrect value for level parameter."
+            )
+
+        self._codec = codec
+        self._threshold = threshold
+        self._level = level
+        self._encoding = encoding
+
+    def encode(self, value: Any) -> bytes:
+        data = self._codec.encode(value) if self._codec is not None else value
+        if isinstance(data, str):
+            data = data.encode(self._encoding)
+
+        if len(data) >= self._threshold:
+            compressed = zlib.compress(data, self._level)
+            if len(compressed) < len(data):
+                return _COMPRESSED + compressed
+
+        return _RAW + data
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        if not isinstance(data, bytes):
+            raise exceptions.InvalidValueException(
+                "Compressed contents must be received as bytes (the Redis client must "
+                "not be configured with decode_responses=True)."
+            )
+
+        prefix, payload = data[:1], data[1:]
+        if prefix == _COMPRESSED:
+            payload = zlib.decompress(payload)
+        elif prefix != _RAW:
+            raise exceptions.InvalidValueException(
+                "Contents were not encoded using ZlibCodec."
+            )
+
+        return self._codec.decode(payload) if self._codec is not None else payload
@@ -1,3 +1,4 @@
+from typing import Union
 import random
 
 DEFAULT_VT = 30
@@ -20,6 +21,7 @@ TOTAL_RECV = "totalrecv"
 NAMESPACE_SEP = ":"
 QUEUE_HASH_SUFFIX = "Q"
 QUEUES_SUFFIX = "QUEUES"
+CHUNKS_SUFFIX = "C"
 ID_CHARACTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
 DEFAULT_ID_RAND_LENGTH = 22
 
@@ -35,6 +37,9 @@ FR = "fr"
 QUEUE_NAME_RE = r"^([a-zA-Z0-9_-]){1,160}$"
 ID_RE = r"^([a-zA-Z0-9:]){32}$"
 
+# Types of message contents accepted by the Redis client
+Contents = Union[str, bytes, bytearray, memoryview]
+
 BASE36_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
 
 
@@ -42,6 +47,12 @@ def _ns_join(*args: str) -> str:
     return NAMESPACE_SEP.join(args)
 
 
+def hash_tag(base: str) -> str:
+    # Not part of the JavaScript implementation: queue names are wrapped in a hash tag
+    # so that all keys of a queue are stored in the same Redis Cluster slot.
+    return "{" + base + "}"
+
+
 def queue_hash(ns: str, base: str) -> str:
     return _ns_join(ns, base, QUEUE_HASH_SUFFIX)
 
@@ -58,6 +69,12 @@ def queue_rt(ns: str, base: str) -> str:
     return _ns_join(ns, RT, base)
 
 
+def queue_chunks_prefix(ns: str, base: str) -> str:
+    # Not part of the JavaScript implementation: prefix of the keys containing the
+    # chunks of offloaded messages (see `AIORSMQ`'s `offload_threshold` parameter).
+    return _ns_join(ns, base, CHUNKS_SUFFIX, "")
+
+
 def message_rc(id: str) -> str:
     return _ns_join(id, RC)
 
@@ -66,12 +83,12 @@ def message_fr(id: str) -> str:
     return _ns_join(id, FR)
 
 
-def message_uid(unix_time: int, microseconds: int) -> str:
-    suffix = "".join(
-        [random.choice(ID_CHARACTERS) for _ in range(DEFAULT_ID_RAND_LENGTH)]
-    )
+def message_uid_suffix() -> str:
+    return "".join(random.choices(ID_CHARACTERS, k=DEFAULT_ID_RAND_LENGTH))
 
-    return base36_encode(unix_time * 1000000 + microseconds) + suffix
+
+def message_uid(unix_time: int, microseconds: int) -> str:
+    return base36_encode(unix_time * 1000000 + microseconds) + message_uid_suffix()
 
 
 def base36_encode(n: int) -> str:
@@ -0,0 +1,147 @@
+from typing import Any, Dict, List, Optional, Set, Union, TYPE_CHECKING
+import asyncio
+
+if TYPE_CHECKING:
+    from aiorsmq.aiorsmq import Message, Queue
+    from aiorsmq.partitioned import PartitionedQueue
+
+# Initial time to wait for messages when the queue is empty (in seconds). It is
+# doubled on every empty receive, up to the iterator's `max_backoff` value.
+_MIN_BACKOFF = 0.1
+
+_END = object()
+
+
+class MessageIterator:
+    """Asynchronous iterator over the messages of a message queue.
+
+    Use `AIORSMQ.consume`, `Queue.consume` or `PartitionedQueue.consume` to create
+    instances of this class.
+    """
+
+    def __init__(
+        self,
+        *,
+        queue: Union["Queue", "PartitionedQueue"],
+        prefetch: int,
+        vt: Optional[int],
+        max_backoff: float,
+    ) -> None:
+        """Initialize a `MessageIterator` object.
+
+        **Note:** This description is provided only for documentation purposes - users
+        of `aiorsmq` have no need for creating `MessageIterator` objects manually.
+
+        Args:
+            queue: Message queue to receive messages from.
+            prefetch: Maximum number of received messages to keep in the local buffer.
+            vt: Visibility timer to use when receiving messages (in seconds).
+            max_backoff: Maximum time to wait between receives when the queue is empty
+                (in seconds).
+        """
+        self._queue = queue
+        self._prefetch = prefetch
+        self._vt = vt
+        self._max_backoff = max_backoff
+
+        self._buffer: "asyncio.Queue[Any]" = asyncio.Queue()
+        # IDs of the messages in the buffer
+        self._buffered: Set[str] = set()
+        self._demand = asyncio.Event()
+        self._task: Optional["asyncio.Future[None]"] = None
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+    def __aiter__(self) -> "MessageIterator":
+        return self
+
+    async def __anext__(self) -> "Message":
+        if self._task is None and not self._closed:
+            self._task = asyncio.ensure_future(self._fetch())
+
+        item = await self._buffer.get()
+        self._demand.set()
+
+        if item is _END:
+            # Leave the marker in place for subsequent calls
+            self._buffer.put_nowait(_END)
+
+            if self._error is not None:
+                raise self._error
+
+            raise StopAsyncIteration
+
+        self._buffered.discard(item.id)
+        return item
+
+    async def __aenter__(self) -> "MessageIterator":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def _fetch(self) -> None:
+        backoff = _MIN_BACKOFF
+
+        try:
+            # Cancelling the task is not enough to stop it, as some libraries may
+            # swallow `CancelledError` (e.g. `asyncio.wait_for` in some versions).
+            while not self._closed:
+                count = self._prefetch - self._buffer.qsize()
+                if count <= 0:
+                    self._demand.clear()
+                    await self._demand.wait()
+                    continue
+
+                messages = await self._queue.receive_many(
+                    count, self._vt, wait_time=backoff
+                )
+
+                for message in messages:
+                    self._buffered.add(message.id)
+                    self._buffer.put_nowait(message)
+
+                if messages:
+                    backoff = _MIN_BACKOFF
+                else:
+                    backoff = min(backoff * 2, self._max_backoff)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._error = e
+            self._closed = True
+            self._buffer.put_nowait(_END)
+
+    def _buffered_ids(self) -> List[str]:
+        """Return the IDs of the messages that were received but not yet returned by
+        the iterator.
+        """
+        return list(self._buffered)
+
+    async def close(self) -> None:
+        """Stop receiving messages.
+
+        Messages that were received but not yet returned by the iterator are made
+        visible again, so that other consumers may receive them immediately.
+        """
+        if self._closed and self._task is None:
+            return
+
+        self._closed = True
+
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        pending: Dict[str, int] = {}
+        while not self._buffer.empty():
+            item = self._buffer.get_nowait()
+            if item is not _END:
+                pending[item.id] = 0
+
+        self._buffered.clear()
+        self._buffer.put_nowait(_END)
+
+        if pending:
+            await self._queue.change_visibility_many(pending)
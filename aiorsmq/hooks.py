@@ -0,0 +1,97 @@
+from typing import Any, List, Optional, Sequence, TYPE_CHECKING
+
+from aiorsmq import exceptions
+
+if TYPE_CHECKING:
+    from aiorsmq.aiorsmq import Message
+
+
+class Hook:
+    """Base class for hooks, which are called by `AIORSMQ` when sending and receiving
+    messages (e.g. for tracing or sampling them).
+
+    Subclasses may override any of the methods below, which do nothing by default.
+    Register hooks using `AIORSMQ.add_hook`. Hooks are called in the order they were
+    registered, except for `after_send`, `after_receive` and `on_error`, which are
+    called in reverse order (so that the first hook registered wraps all others).
+    Hooks are called synchronously, so they should not block. Exceptions raised by
+    hooks are propagated to the caller.
+    """
+
+    def before_send(self, queue_name: str, contents: List[Any]) -> Optional[List[Any]]:
+        """Called before sending one or more messages.
+
+        Args:
+            queue_name: Name of the message queue.
+            contents: Contents of the messages, before being encoded by the
+                `AIORSMQ` object's codec (if any).
+
+        Returns:
+            A list of the same length as `contents`, to replace the contents of the
+            messages being sent, or `None` to leave them unchanged.
+        """
+        return None
+
+    def after_send(self, queue_name: str, contents: List[Any], ids: List[str]) -> None:
+        """Called after successfully sending one or more messages.
+
+        Args:
+            queue_name: Name of the message queue.
+            contents: Contents of the messages that were sent.
+            ids: IDs of the messages that were sent, in the same order as `contents`.
+        """
+
+    def after_receive(self, queue_name: str, messages: List["Message"]) -> None:
+        """Called after receiving or popping messages, even if no messages were
+        received.
+
+        Args:
+            queue_name: Name of the message queue.
+            messages: Messages received.
+        """
+
+    def on_error(self, queue_name: str, operation: str, error: Exception) -> None:
+        """Called when sending, receiving or popping messages fails.
+
+        Args:
+            queue_name: Name of the message queue.
+            operation: Operation that failed: `"send"`, `"receive"` or `"pop"`.
+            error: Exception that will be raised to the caller.
+        """
+
+
+def before_send(
+    hooks: Sequence[Hook], queue_name: str, contents: List[Any]
+) -> List[Any]:
+    for hook in hooks:
+        result = hook.before_send(queue_name, contents)
+        if result is not None:
+            if len(result) != len(contents):
+                raise exceptions.InvalidValueException(
+                    "Hooks must not change the number of messages being sent."
+                )
+
+            contents = result
+
+    return contents
+
+
+def after_send(
+    hooks: Sequence[Hook], queue_name: str, contents: List[Any], ids: List[str]
+) -> None:
+    for hook in reversed(hooks):
+        hook.after_send(queue_name, contents, ids)
+
+
+def after_receive(
+    hooks: Sequence[Hook], queue_name: str, messages: List["Message"]
+) -> None:
+    for hook in reversed(hooks):
+        hook.after_receive(queue_name, messages)
+
+
+def on_error(
+    hooks: Sequence[Hook], queue_name: str, operation: str, error: Exception
+) -> None:
+    for hook in reversed(hooks):
+        hook.on_error(queue_name, operation, error)
@@ -0,0 +1,276 @@
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+import bisect
+import functools
+import sys
+import time
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# Upper bounds of the latency histogram buckets (in seconds), as used by default by
+# the Prometheus client libraries.
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+
+class _Call:
+    __slots__ = ["round_trips"]
+
+    def __init__(self) -> None:
+        self.round_trips = 0
+
+
+class _NoCurrentCall:
+    """Stand-in for `_current_call` on Python 3.6, where `contextvars` is not
+    available. Round trips are not counted.
+    """
+
+    def get(self) -> Optional[_Call]:
+        return None
+
+    def set(self, call: _Call) -> None:
+        return None
+
+    def reset(self, token: None) -> None:
+        pass
+
+
+# Call being measured in the current task (if any), used for counting round trips
+if sys.version_info >= (3, 7):
+    from contextvars import ContextVar
+
+    _current_call: "ContextVar[Optional[_Call]]" = ContextVar(
+        "aiorsmq_current_call", default=None
+    )
+else:
+    _current_call = _NoCurrentCall()
+
+
+def round_trip() -> None:
+    """Record a round trip to Redis for the call being measured, if any."""
+    call = _current_call.get()
+    if call is not None:
+        call.round_trips += 1
+
+
+class _OperationStats:
+    __slots__ = ["calls", "errors", "empty", "round_trips", "latency_sum", "counts"]
+
+    def __init__(self, buckets: int) -> None:
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.empty = 0
+        self.round_trips = 0
+        self.latency_sum = 0.0
+        # One counter per bucket, plus one for latencies above the last bucket
+        self.counts = [0] * (buckets + 1)
+
+
+class Metrics:
+    """Collects call counts, error counts, round trips to Redis and latencies for
+    each `AIORSMQ` operation.
+
+    Pass an instance of this class to `AIORSMQ` using its `metrics` parameter. The
+    same instance may be shared by multiple `AIORSMQ` objects. Calls made through
+    `Queue` handles are recorded under the name of the equivalent `AIORSMQ` method.
+
+    **Note:** Round trips are only counted on Python 3.7 and later (they are always
+    reported as 0 on Python 3.6).
+    """
+
+    def __init__(self, *, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize a `Metrics` object.
+
+        Args:
+            buckets: Upper bounds of the latency histogram buckets (in seconds), in
+                increasing order.
+        """
+        self._buckets = sorted(buckets)
+        self._operations: Dict[str, _OperationStats] = {}
+
+    async def _observe(
+        self, operation: str, polling: bool, call: Awaitable[Any]
+    ) -> Any:
+        state = _Call()
+        token = _current_call.set(state)
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        result = None
+
+        try:
+            result = await call
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_call.reset(token)
+
+            stats = self._operations.get(operation)
+            if stats is None:
+                stats = self._operations[operation] = _OperationStats(
+                    len(self._buckets)
+                )
+
+            stats.calls += 1
+            stats.round_trips += state.round_trips
+            stats.latency_sum += elapsed
+            stats.counts[bisect.bisect_left(self._buckets, elapsed)] += 1
+
+            if error is not None:
+                name = type(error).__name__
+                stats.errors[name] = stats.errors.get(name, 0) + 1
+            elif polling and not result:
+                stats.empty += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the values collected so far.
+
+        Returns:
+            Dictionary mapping each operation name (e.g. `"send_message"`) to a
+            dictionary containing:
+
+            - `calls`: Number of calls.
+            - `errors`: Dictionary mapping exception class names to the number of
+              calls that raised them.
+            - `empty`: Number of calls to `receive_message(s)` or `pop_message(s)`
+              that returned no messages.
+            - `round_trips`: Number of round trips to Redis.
+            - `latency_sum`: Sum of the latencies of all calls (in seconds).
+            - `latency_buckets`: List of `(upper_bound, count)` tuples, where
+              `count` is the number of calls that took at most `upper_bound`
+              seconds. The last tuple's upper bound is `float("inf")`.
+        """
+        result = {}
+        bounds = self._buckets + [float("inf")]
+
+        for operation, stats in self._operations.items():
+            buckets: List[Tuple[float, int]] = []
+            total = 0
+            for bound, count in zip(bounds, stats.counts):
+                total += count
+                buckets.append((bound, total))
+
+            result[operation] = {
+                "calls": stats.calls,
+                "errors": dict(stats.errors),
+                "empty": stats.empty,
+                "round_trips": stats.round_trips,
+                "latency_sum": stats.latency_sum,
+                "latency_buckets": buckets,
+            }
+
+        return result
+
+    def reset(self) -> None:
+        """Discard all values collected so far."""
+        self._operations.clear()
+
+
+def instrumented(operation: str, polling: bool = False) -> Callable[[F], F]:
+    # Records the calls of a method into the `Metrics` object stored in the
+    # instance's `_metrics` attribute, if any.
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            metrics: Optional[Metrics] = self._metrics
+            if metrics is None:
+                return await func(self, *args, **kwargs)
+
+            return await metrics._observe(
+                operation, polling, func(self, *args, **kwargs)
+            )
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(snapshot: Dict[str, Dict[str, Any]], prefix: str = "aiorsmq") -> str:
+    """Format a snapshot returned by `Metrics.snapshot` using the Prometheus text
+    exposition format.
+
+    Args:
+        snapshot: Values returned by `Metrics.snapshot`.
+        prefix: Prefix for the name of each metric.
+
+    Returns:
+        Metrics in the Prometheus text exposition format.
+    """
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help: str) -> str:
+        lines.append(f"# HELP {prefix}_{name} {help}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        return f"{prefix}_{name}"
+
+    def sample(name: str, labels: Dict[str, str], value: float) -> None:
+        formatted = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        lines.append(f"{name}{{{formatted}}} {_format_value(value)}")
+
+    operations = sorted(snapshot.items())
+
+    name = metric("calls_total", "counter", "Number of calls.")
+    for operation, stats in operations:
+        sample(name, {"operation": operation}, stats["calls"])
+
+    name = metric("errors_total", "counter", "Number of calls that raised an error.")
+    for operation, stats in operations:
+        for exception, count in sorted(stats["errors"].items()):
+            sample(name, {"operation": operation, "exception": exception}, count)
+
+    name = metric(
+        "empty_total", "counter", "Number of receives or pops that found no messages."
+    )
+    for operation, stats in operations:
+        sample(name, {"operation": operation}, stats["empty"])
+
+    name = metric("round_trips_total", "counter", "Number of round trips to Redis.")
+    for operation, stats in operations:
+        sample(name, {"operation": operation}, stats["round_trips"])
+
+    name = metric("latency_seconds", "histogram", "Latency of calls (in seconds).")
+    for operation, stats in operations:
+        for bound, count in stats["latency_buckets"]:
+            labels = {"operation": operation, "le": _format_value(bound)}
+            sample(name + "_bucket", labels, count)
+
+        sample(name + "_sum", {"operation": operation}, stats["latency_sum"])
+        sample(name + "_count", {"operation": operation}, stats["calls"])
+
+    return "\n".join(lines) + "\n"
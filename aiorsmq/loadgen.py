@@ -0,0 +1,605 @@
+"""Load generator for stress testing message queues.
+
+Runs a configurable mix of producers and consumers against a single message queue,
+and reports throughput, end-to-end latency, redeliveries and violations of the
+queue's delivery guarantees. Usage:
+
+    python -m aiorsmq.loadgen [--redis-url URL] [--producers N] [--consumers N]
+        [--messages N | --duration SECONDS] [--rate MESSAGES_PER_SEC]
+        [--payload-size SIZES] [--vt SECONDS] [--failure-ratio RATIO] ...
+
+Run `python -m aiorsmq.loadgen --help` for the full list of options.
+
+A violation is recorded when a message is received while it should still have been
+invisible (i.e. less than `vt` seconds after another consumer received it), when a
+message is received after it was deleted, or when a message is received without
+its receive count increasing. Latencies are computed from `Message.sent`, so the
+clocks of the Redis server and of the load generator should be synchronized.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+import aioredis  # type: ignore
+
+from aiorsmq import exceptions
+from aiorsmq.aiorsmq import AIORSMQ, Message, Queue
+
+# Maximum number of violations to include in the report
+_MAX_VIOLATION_EXAMPLES = 10
+
+# Time to wait before polling an empty queue again, when not using real time mode
+_POLL_INTERVAL = 0.01
+
+# Time to wait for real time notifications when polling an empty queue
+_WAIT_TIME = 1.0
+
+# Resolution of the server time used for visibility timers, which the scripts
+# truncate to whole milliseconds. Messages may become visible again up to this much
+# earlier than `vt` seconds after being received.
+_TIMER_RESOLUTION = 0.001
+
+PayloadSizes = Sequence[Tuple[int, int, float]]
+
+
+def parse_payload_sizes(value: str) -> PayloadSizes:
+    """Parse a payload size distribution.
+
+    The distribution consists of comma-separated entries of the form `SIZE` or
+    `MIN-MAX` (sizes in bytes), optionally followed by `:WEIGHT`. For each message,
+    an entry is chosen at random according to the weights (1 by default), and then
+    a size between `MIN` and `MAX` is chosen uniformly. Example: `16:9,1024-65536:1`.
+
+    Args:
+        value: Distribution to parse.
+
+    Raises:
+        exceptions.InvalidValueException: When the distribution is invalid.
+
+    Returns:
+        List of `(min, max, weight)` tuples.
+    """
+    sizes = []
+
+    try:
+        for entry in value.split(","):
+            size, _, weight = entry.partition(":")
+            low, _, high = size.partition("-")
+            sizes.append((int(low), int(high or low), float(weight or 1)))
+    except ValueError:
+        raise exceptions.InvalidValueException(
+            f"Incorrect value for payload sizes: '{value}'."
+        )
+
+    if any(low < 0 or high < low or weight <= 0 for low, high, weight in sizes):
+        raise exceptions.InvalidValueException(
+            f"Incorrect value for payload sizes: '{value}'."
+        )
+
+    return sizes
+
+
+class LoadConfig(NamedTuple):
+    """Configuration of a load generator run (see `run`)."""
+
+    queue_name: str = "loadgen"
+    producers: int = 1
+    consumers: int = 1
+    messages: int = 10000
+    duration: Optional[float] = None
+    rate: Optional[float] = None
+    payload_sizes: PayloadSizes = ((1024, 1024, 1.0),)
+    send_batch_size: int = 1
+    receive_batch_size: int = 1
+    vt: int = 30
+    failure_ratio: float = 0.0
+    processing_time: float = 0.0
+    drain_timeout: float = 60.0
+    real_time: bool = False
+    keep_queue: bool = False
+
+
+class _Tracker:
+    """Keeps track of every message sent and received during a run."""
+
+    def __init__(self, vt: int) -> None:
+        self._vt = vt
+        self.sent: Set[str] = set()
+        self.deleted: Set[str] = set()
+        # Local time at which each message's visibility timer expires
+        self._leases: Dict[str, float] = {}
+        self._rcs: Dict[str, int] = {}
+        self.deliveries = 0
+        self.failures = 0
+        self.delete_misses = 0
+        self.latencies: List[float] = []
+        self.violations = 0
+        self.violation_examples: List[Dict[str, str]] = []
+        self.errors: Dict[str, int] = {}
+
+    def received(self, message: Message, started: float) -> None:
+        # `started` is the local time before the receive call was made, so leases
+        # never end later than the message's actual visibility timer, and network
+        # latency cannot produce false positives.
+        now = time.monotonic()
+        id = message.id
+        self.deliveries += 1
+
+        if id in self.deleted:
+            self._violation(id, "received after being deleted")
+        elif now < self._leases.get(id, 0.0):
+            self._violation(id, "received while invisible")
+
+        if message.rc <= self._rcs.get(id, 0):
+            self._violation(id, "receive count did not increase")
+
+        if id not in self._rcs:
+            self.latencies.append(time.time() * 1000 - message.sent)
+
+        self._rcs[id] = max(message.rc, self._rcs.get(id, 0))
+        self._leases[id] = started + self._vt - _TIMER_RESOLUTION
+
+    def acknowledged(self, ids: Sequence[str], deleted: Sequence[str]) -> None:
+        self.delete_misses += len(ids) - len(deleted)
+        self.deleted.update(deleted)
+        for id in deleted:
+            self._leases.pop(id, None)
+
+    def error(self, error: Exception) -> None:
+        name = type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    @property
+    def unique_received(self) -> int:
+        return len(self._rcs)
+
+    def _violation(self, id: str, reason: str) -> None:
+        self.violations += 1
+        if len(self.violation_examples) < _MAX_VIOLATION_EXAMPLES:
+            self.violation_examples.append({"id": id, "reason": reason})
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+
+    index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+class _Producers:
+    def __init__(self, queue: Queue, config: LoadConfig, tracker: _Tracker) -> None:
+        self._queue = queue
+        self._config = config
+        self._tracker = tracker
+        self._remaining = config.messages
+        self._deadline = (
+            None if config.duration is None else time.monotonic() + config.duration
+        )
+        self._next_send = time.monotonic()
+        self._weights = [weight for _, _, weight in config.payload_sizes]
+
+    def _take(self) -> int:
+        if self._deadline is not None:
+            if time.monotonic() >= self._deadline:
+                return 0
+
+            return self._config.send_batch_size
+
+        count = min(self._remaining, self._config.send_batch_size)
+        self._remaining -= count
+        return count
+
+    def _payload(self) -> bytes:
+        low, high, _ = random.choices(self._config.payload_sizes, self._weights)[0]
+        return b"x" * random.randint(low, high)
+
+    async def _produce(self) -> None:
+        while True:
+            count = self._take()
+            if not count:
+                return
+
+            if self._config.rate:
+                # Spread sends evenly over time, across all producers
+                delay = self._next_send - time.monotonic()
+                self._next_send = max(self._next_send, time.monotonic())
+                self._next_send += count / self._config.rate
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            payloads = [self._payload() for _ in range(count)]
+            try:
+                if count == 1:
+                    ids = [await self._queue.send(payloads[0])]
+                else:
+                    ids = await self._queue.send_many(payloads)
+            except Exception as e:
+                self._tracker.error(e)
+                continue
+
+            self._tracker.sent.update(ids)
+
+    async def run(self) -> None:
+        await asyncio.gather(*[self._produce() for _ in range(self._config.producers)])
+
+
+class _Consumers:
+    def __init__(self, queue: Queue, config: LoadConfig, tracker: _Tracker) -> None:
+        self._queue = queue
+        self._config = config
+        self._tracker = tracker
+        self._wait_time = _WAIT_TIME if config.real_time else None
+        self._stopping = False
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    async def _receive(self) -> List[Message]:
+        batch_size = self._config.receive_batch_size
+        if batch_size == 1:
+            message = await self._queue.receive(self._config.vt, self._wait_time)
+            return [message] if message is not None else []
+
+        return await self._queue.receive_many(
+            batch_size, self._config.vt, self._wait_time
+        )
+
+    async def _acknowledge(self, ids: List[str]) -> List[str]:
+        if len(ids) != 1:
+            return await self._queue.delete_many(ids)
+
+        try:
+            await self._queue.delete(ids[0])
+        except exceptions.MessageNotFoundException:
+            return []
+
+        return ids
+
+    async def _consume(self) -> None:
+        tracker = self._tracker
+
+        while not self._stopping:
+            started = time.monotonic()
+            try:
+                messages = await self._receive()
+            except Exception as e:
+                tracker.error(e)
+                await asyncio.sleep(_POLL_INTERVAL)
+                continue
+
+            if not messages:
+                if self._wait_time is None:
+                    await asyncio.sleep(_POLL_INTERVAL)
+                continue
+
+            for message in messages:
+                tracker.received(message, started)
+
+            if self._config.processing_time:
+                await asyncio.sleep(self._config.processing_time)
+
+            # Simulate failed processing by leaving some messages in the queue, so
+            # that they are received again once their visibility timer expires
+            ids = []
+            for message in messages:
+                if random.random() < self._config.failure_ratio:
+                    tracker.failures += 1
+                else:
+                    ids.append(message.id)
+
+            if not ids:
+                continue
+
+            try:
+                tracker.acknowledged(ids, await self._acknowledge(ids))
+            except Exception as e:
+                tracker.error(e)
+
+    async def run(self) -> None:
+        await asyncio.gather(*[self._consume() for _ in range(self._config.consumers)])
+
+
+async def run(rsmq: AIORSMQ, config: LoadConfig) -> Dict[str, Any]:
+    """Run a load test using the given configuration.
+
+    The message queue is (re)created at the start of the run, using `config.vt` as
+    its visibility timer and without a maximum message size. Producers send
+    `config.messages` messages, or keep sending messages for `config.duration`
+    seconds if it is set. Consumers receive and delete messages until every message
+    sent has been deleted, or until `config.drain_timeout` seconds have passed since
+    the producers finished. If `config.real_time` is set, consumers wait for real
+    time notifications instead of polling when the queue is empty, which requires
+    real time mode to be enabled in `rsmq`.
+
+    Args:
+        rsmq: `AIORSMQ` object to use for sending and receiving messages.
+        config: Configuration of the run.
+
+    Raises:
+        exceptions.InvalidValueException: When the configuration contains an invalid
+            value.
+
+    Returns:
+        Dictionary containing the results of the run.
+    """
+    if config.producers < 1 or config.consumers < 1:
+        raise exceptions.InvalidValueException(
+            "Incorrect value for producers or consumers."
+        )
+
+    if config.send_batch_size < 1 or config.receive_batch_size < 1:
+        raise exceptions.InvalidValueException("Incorrect value for batch sizes.")
+
+    if not 0 <= config.failure_ratio <= 1:
+        raise exceptions.InvalidValueException(
+            "Incorrect value for failure_ratio parameter."
+        )
+
+    try:
+        await rsmq.delete_queue(config.queue_name)
+    except exceptions.QueueNotFoundException:
+        pass
+
+    await rsmq.create_queue(config.queue_name, vt=config.vt, max_size=-1)
+    queue = rsmq.queue(config.queue_name)
+
+    tracker = _Tracker(config.vt)
+    producers = _Producers(queue, config, tracker)
+    consumers = _Consumers(queue, config, tracker)
+
+    start = time.monotonic()
+    consuming = asyncio.ensure_future(consumers.run())
+
+    try:
+        await producers.run()
+        produced = time.monotonic()
+
+        deadline = produced + config.drain_timeout
+        while len(tracker.deleted) < len(tracker.sent) and time.monotonic() < deadline:
+            await asyncio.sleep(_POLL_INTERVAL)
+    finally:
+        consumers.stop()
+        await consuming
+
+    elapsed = time.monotonic() - start
+
+    if not config.keep_queue:
+        await rsmq.delete_queue(config.queue_name)
+
+    latencies = sorted(tracker.latencies)
+
+    return {
+        "duration": elapsed,
+        "sent": len(tracker.sent),
+        "received": tracker.deliveries,
+        "unique_received": tracker.unique_received,
+        "redeliveries": tracker.deliveries - tracker.unique_received,
+        "failures": tracker.failures,
+        "deleted": len(tracker.deleted),
+        "delete_misses": tracker.delete_misses,
+        "lost": len(tracker.sent - tracker.deleted),
+        "errors": tracker.errors,
+        "throughput": {
+            "send": len(tracker.sent) / max(produced - start, 1e-9),
+            "receive": tracker.deliveries / elapsed,
+            "delete": len(tracker.deleted) / elapsed,
+        },
+        "latency_ms": {
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+        "violations": tracker.violations,
+        "violation_examples": tracker.violation_examples,
+    }
+
+
+def _format_report(report: Dict[str, Any]) -> str:
+    throughput = report["throughput"]
+    latency = report["latency_ms"]
+    lines = [
+        f"Duration:       {report['duration']:.2f} s",
+        f"Sent:           {report['sent']} ({throughput['send']:.1f}/s)",
+        f"Received:       {report['received']} ({throughput['receive']:.1f}/s), "
+        f"{report['unique_received']} unique",
+        f"Redeliveries:   {report['redeliveries']} "
+        f"({report['failures']} simulated failures)",
+        f"Deleted:        {report['deleted']} ({throughput['delete']:.1f}/s), "
+        f"{report['delete_misses']} already deleted",
+        f"Lost:           {report['lost']}",
+        f"Latency (ms):   p50 {latency['p50']:.2f}, p90 {latency['p90']:.2f}, "
+        f"p99 {latency['p99']:.2f}, max {latency['max']:.2f}",
+        f"Errors:         {report['errors'] or 'none'}",
+        f"Violations:     {report['violations']}",
+    ]
+
+    for violation in report["violation_examples"]:
+        lines.append(f"  {violation['id']}: {violation['reason']}")
+
+    return "\n".join(lines)
+
+
+def _payload_sizes(value: str) -> PayloadSizes:
+    try:
+        return parse_payload_sizes(value)
+    except exceptions.InvalidValueException as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m aiorsmq.loadgen",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument(
+        "--redis-url",
+        default="redis://localhost:6379",
+        help="URL of the Redis server to use (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--namespace",
+        default="aiorsmq-loadgen",
+        help="Namespace to use (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--queue",
+        default="loadgen",
+        help="Name of the message queue, which is deleted and created again "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--producers", type=int, default=1, help="Number of producers (default: 1)."
+    )
+    parser.add_argument(
+        "--consumers", type=int, default=1, help="Number of consumers (default: 1)."
+    )
+    parser.add_argument(
+        "--messages",
+        type=int,
+        default=10000,
+        help="Number of messages to send (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="Send messages for this many seconds, instead of sending a fixed number "
+        "of messages.",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Maximum number of messages to send per second, across all producers. "
+        "By default, messages are sent as fast as possible.",
+    )
+    parser.add_argument(
+        "--payload-size",
+        type=_payload_sizes,
+        default="1024",
+        help="Payload size distribution, as comma-separated SIZE or MIN-MAX entries "
+        "(in bytes), each optionally followed by :WEIGHT. Example: "
+        "16:9,1024-65536:1 (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--send-batch-size",
+        type=int,
+        default=1,
+        help="Number of messages to send per call (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--receive-batch-size",
+        type=int,
+        default=1,
+        help="Maximum number of messages to receive per call (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--vt",
+        type=int,
+        default=30,
+        help="Visibility timer of received messages, in seconds "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--failure-ratio",
+        type=float,
+        default=0.0,
+        help="Ratio of received messages that consumers do not delete, so that they "
+        "are redelivered once their visibility timer expires (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--processing-time",
+        type=float,
+        default=0.0,
+        help="Time consumers spend processing each batch of received messages, in "
+        "seconds (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=60.0,
+        help="Maximum time to wait for all messages to be deleted once producers "
+        "have finished, in seconds (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--real-time",
+        action="store_true",
+        help="Enable real time mode, and have consumers wait for notifications "
+        "instead of polling when the queue is empty.",
+    )
+    parser.add_argument(
+        "--keep-queue",
+        action="store_true",
+        help="Do not delete the message queue at the end of the run.",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the report in JSON format."
+    )
+
+    return parser
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    client = aioredis.from_url(args.redis_url, decode_responses=False)
+    rsmq = AIORSMQ(client=client, namespace=args.namespace, real_time=args.real_time)
+    config = LoadConfig(
+        queue_name=args.queue,
+        producers=args.producers,
+        consumers=args.consumers,
+        messages=args.messages,
+        duration=args.duration,
+        rate=args.rate,
+        payload_sizes=args.payload_size,
+        send_batch_size=args.send_batch_size,
+        receive_batch_size=args.receive_batch_size,
+        vt=args.vt,
+        failure_ratio=args.failure_ratio,
+        processing_time=args.processing_time,
+        drain_timeout=args.drain_timeout,
+        real_time=args.real_time,
+        keep_queue=args.keep_queue,
+    )
+
+    try:
+        return await run(rsmq, config)
+    finally:
+        await rsmq.quit()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the load generator from the command line.
+
+    Args:
+        argv: Command line arguments. By default, `sys.argv` is used.
+
+    Returns:
+        Exit status: 1 if any violations were found or any messages were lost, 0
+        otherwise.
+    """
+    args = _argument_parser().parse_args(argv)
+
+    # `asyncio.run` is not available in Python 3.6
+    loop = asyncio.new_event_loop()
+    try:
+        report = loop.run_until_complete(_main(args))
+    except exceptions.InvalidValueException as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        loop.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(_format_report(report))
+
+    return 1 if report["violations"] or report["lost"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
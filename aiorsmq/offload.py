@@ -0,0 +1,122 @@
+from typing import Any, AsyncIterator, List, Optional, Tuple, Union
+import asyncio
+import codecs
+
+import aioredis  # type: ignore
+
+from aiorsmq import compat, exceptions
+
+# Prefix of the value stored in the queue's hash in place of an offloaded message's
+# contents. It is followed by the number of chunks and the name of the key containing
+# them, separated by a colon.
+MARKER = "\x00aiorsmq:offload:"
+_MARKER_BYTES = MARKER.encode()
+_MARKER_LENGTH = len(MARKER)
+
+# Chunk keys are named after the random part of the message's ID
+_ID_SUFFIX_START = -compat.DEFAULT_ID_RAND_LENGTH
+
+# Time to keep the chunks of a popped message around (in milliseconds), so that the
+# client that popped it is able to read them.
+POP_TTL = 60000
+
+# Number of chunks to fetch per round trip when streaming a message's contents.
+_STREAM_WINDOW = 4
+
+
+def split(data: bytes, chunk_size: int, encoding: Optional[str]) -> List[memoryview]:
+    """Split `data` into chunks of at most `chunk_size` bytes.
+
+    When `encoding` is specified, `data` is assumed to be text encoded with it. For
+    UTF-8, text is only split at character boundaries, so that each chunk can be
+    decoded separately (e.g. by Redis clients using `decode_responses=True`).
+    """
+    text = encoding is not None and codecs.lookup(encoding).name == "utf-8"
+    chunks: List[memoryview] = []
+    view = memoryview(data)
+    start = 0
+
+    while start < len(data):
+        end = min(start + chunk_size, len(data))
+
+        if text:
+            # Do not split multi-byte characters (continuation bytes are 10xxxxxx)
+            while end < len(data) and end > start + 1 and data[end] & 0xC0 == 0x80:
+                end -= 1
+
+        chunks.append(view[start:end])
+        start = end
+
+    return chunks
+
+
+def reference(key: str, chunks: int) -> str:
+    return f"{MARKER}{chunks}:{key}"
+
+
+def parse_reference(contents: Any, encoding: str) -> Optional[Tuple[str, int]]:
+    """Return the key and number of chunks referenced by `contents` if it is the
+    reference to an offloaded message's chunks, or `None` otherwise.
+    """
+    if isinstance(contents, bytes):
+        if not contents.startswith(_MARKER_BYTES):
+            return None
+
+        contents = contents.decode(encoding)
+    elif not isinstance(contents, str) or not contents.startswith(MARKER):
+        return None
+
+    chunks, _, key = contents[_MARKER_LENGTH:].partition(":")
+    return key, int(chunks)
+
+
+def join(chunks: List[Union[str, bytes]]) -> Union[str, bytes]:
+    if chunks and isinstance(chunks[0], str):
+        return "".join(chunks)  # type: ignore
+
+    return b"".join(chunks)  # type: ignore
+
+
+async def read_chunks(
+    client: aioredis.Redis, key: str, count: int, delete: bool
+) -> AsyncIterator[Union[str, bytes]]:
+    """Read the `count` chunks of an offloaded message from Redis, a few at a time.
+    If `delete` is `True`, the chunks are deleted once they have been read.
+
+    Raises:
+        exceptions.MessageNotFoundException: When the chunks no longer exist, or
+            were deleted (or expired) while reading them.
+    """
+    pending = asyncio.ensure_future(client.lrange(key, 0, _STREAM_WINDOW - 1))
+    start = 0
+
+    try:
+        while start < count:
+            chunks = await pending
+            if not chunks:
+                raise exceptions.MessageNotFoundException(
+                    "The contents of the message no longer exist."
+                )
+
+            start += len(chunks)
+            if start < count:
+                # Request the next chunks while the current ones are consumed
+                pending = asyncio.ensure_future(
+                    client.lrange(key, start, start + _STREAM_WINDOW - 1)
+                )
+
+            for chunk in chunks:
+                yield chunk
+    finally:
+        if not pending.done():
+            pending.cancel()
+
+        if delete:
+            await client.delete(key)
+
+
+def chunks_key(prefix: str, id: str) -> str:
+    """Return the key containing the chunks of the message with the given ID (see
+    `compat.queue_chunks_prefix`).
+    """
+    return prefix + id[_ID_SUFFIX_START:]
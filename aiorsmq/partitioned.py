@@ -0,0 +1,420 @@
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+import asyncio
+import zlib
+
+from aiorsmq import compat, consumer, exceptions
+from aiorsmq.aiorsmq import AIORSMQ, Message, Queue, QueueAttributes
+
+T = TypeVar("T")
+
+# Separates a message's ID from the index of the partition containing it, in the IDs
+# returned by `PartitionedQueue`.
+_PARTITION_SEP = ":"
+
+# Maximum time to wait for a real time notification before checking the partitions
+# again, when receiving messages with `wait_time`.
+_WAIT_POLL_INTERVAL = 1.0
+
+
+async def _gather(aws: List[Awaitable[T]]) -> List[T]:
+    # Unlike `asyncio.gather`, wait for all operations to finish before raising the
+    # first exception, so that no operation is left running in the background.
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    return results  # type: ignore
+
+
+class PartitionedQueue:
+    """Logical message queue spread across multiple message queues (partitions),
+    which may be stored in different Redis servers.
+
+    Messages are sent to the partitions in a round-robin fashion, or to the partition
+    selected by a key (so that messages with the same key are always stored in the
+    same partition). Receives check the partitions one after the other until enough
+    messages are found, starting from a different partition on every call, so that no
+    partition is starved.
+
+    Partition `i` of a partitioned queue named `name` is a regular message queue
+    named `name-i`. Message IDs returned by this class include the index of the
+    partition containing the message (e.g. `<ID>:3`), and must be passed as-is to the
+    methods that expect a message ID.
+
+    Each method is equivalent to the `AIORSMQ` method with the same description,
+    minus the `queue_name` parameter.
+    """
+
+    def __init__(
+        self,
+        *,
+        rsmq: Union[AIORSMQ, Sequence[AIORSMQ]],
+        name: str,
+        partitions: int,
+    ) -> None:
+        """Initialize a `PartitionedQueue` object.
+
+        **Note:** This method does not check whether the partitions exist. Use
+        `create_queue` to create them.
+
+        Args:
+            rsmq: `AIORSMQ` object to use for accessing the partitions. If a sequence
+                of objects is specified, partition `i` is accessed using object
+                `i % len(rsmq)`.
+            name: Name of the partitioned queue.
+            partitions: Number of partitions.
+
+        Raises:
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
+        """
+        clients = [rsmq] if isinstance(rsmq, AIORSMQ) else list(rsmq)
+
+        if partitions < 1:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for partitions parameter."
+            )
+
+        if not clients:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for rsmq parameter."
+            )
+
+        self._name = name
+        self._clients = [clients[i % len(clients)] for i in range(partitions)]
+        self._queues = [
+            client.queue(f"{name}-{i}") for i, client in enumerate(self._clients)
+        ]
+        self._send_cursor = 0
+        self._receive_cursor = 0
+
+    @property
+    def name(self) -> str:
+        """Name of the partitioned queue."""
+        return self._name
+
+    @property
+    def partitions(self) -> List[Queue]:
+        """Handles for the partitions, in order."""
+        return list(self._queues)
+
+    def partition_for(self, key: Union[str, bytes]) -> int:
+        """Return the index of the partition that messages sent using `key` are
+        stored in.
+
+        Args:
+            key: Partitioning key.
+
+        Returns:
+            Index of the partition.
+        """
+        if isinstance(key, str):
+            key = key.encode()
+
+        # Python's `hash` is randomized per process, so it cannot be used here
+        return zlib.crc32(key) % len(self._queues)
+
+    def _next_partition(self, key: Optional[Union[str, bytes]]) -> int:
+        if key is not None:
+            return self.partition_for(key)
+
+        index = self._send_cursor
+        self._send_cursor = (index + 1) % len(self._queues)
+        return index
+
+    def _split_id(self, id: str) -> Tuple[int, str]:
+        id, _, index = id.rpartition(_PARTITION_SEP)
+
+        if not index.isdigit() or int(index) >= len(self._queues):
+            raise exceptions.InvalidValueException("Incorrect format for message ID.")
+
+        return int(index), id
+
+    @staticmethod
+    def _join_id(index: int, id: str) -> str:
+        return id + _PARTITION_SEP + str(index)
+
+    def _qualify(self, index: int, messages: List[Message]) -> List[Message]:
+        for message in messages:
+            message._id = self._join_id(index, message.id)
+
+        return messages
+
+    async def create_queue(
+        self,
+        vt: int = compat.DEFAULT_VT,
+        delay: int = compat.DEFAULT_DELAY,
+        max_size: int = compat.DEFAULT_MAX_SIZE,
+    ) -> None:
+        """See `AIORSMQ.create_queue`. All partitions are created."""
+        await _gather(
+            [
+                client.create_queue(queue.name, vt, delay, max_size)
+                for client, queue in zip(self._clients, self._queues)
+            ]
+        )
+
+    async def delete_queue(self) -> None:
+        """See `AIORSMQ.delete_queue`. All partitions are deleted."""
+        await _gather(
+            [
+                client.delete_queue(queue.name)
+                for client, queue in zip(self._clients, self._queues)
+            ]
+        )
+
+    @staticmethod
+    def _aggregate(attributes: List[QueueAttributes]) -> QueueAttributes:
+        return QueueAttributes(
+            vt=attributes[0].vt,
+            delay=attributes[0].delay,
+            max_size=attributes[0].max_size,
+            total_recv=sum(a.total_recv for a in attributes),
+            total_sent=sum(a.total_sent for a in attributes),
+            created=min(a.created for a in attributes),
+            modified=max(a.modified for a in attributes),
+            messages=sum(a.messages for a in attributes),
+            hidden_messages=sum(a.hidden_messages for a in attributes),
+        )
+
+    async def get_attributes(self) -> QueueAttributes:
+        """See `AIORSMQ.get_queue_attributes`.
+
+        Message counters are summed across partitions. The `vt`, `delay` and
+        `max_size` attributes are those of the first partition.
+        """
+        return self._aggregate(
+            await _gather([queue.get_attributes() for queue in self._queues])
+        )
+
+    async def set_attributes(
+        self,
+        vt: Optional[int] = None,
+        delay: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> QueueAttributes:
+        """See `AIORSMQ.set_queue_attributes`. All partitions are modified."""
+        return self._aggregate(
+            await _gather(
+                [queue.set_attributes(vt, delay, max_size) for queue in self._queues]
+            )
+        )
+
+    async def send(
+        self,
+        contents: Any,
+        delay: Optional[int] = None,
+        key: Optional[Union[str, bytes]] = None,
+    ) -> str:
+        """See `AIORSMQ.send_message`.
+
+        If `key` is specified, the message is sent to the partition selected by it
+        (see `partition_for`). Otherwise, partitions are used in turns.
+        """
+        index = self._next_partition(key)
+        id = await self._queues[index].send(contents, delay)
+
+        return self._join_id(index, id)
+
+    async def send_many(
+        self,
+        contents: List[Any],
+        delay: Union[None, int, List[Optional[int]]] = None,
+        key: Optional[Union[str, bytes]] = None,
+    ) -> List[str]:
+        """See `AIORSMQ.send_messages`.
+
+        If `key` is specified, all messages are sent to the partition selected by it
+        (see `partition_for`). Otherwise, messages are spread across the partitions,
+        using a single round trip per partition.
+        """
+        delays = AIORSMQ._validate_delays(contents, delay)
+
+        groups: Dict[int, List[int]] = {}
+        for position in range(len(contents)):
+            groups.setdefault(self._next_partition(key), []).append(position)
+
+        results = await _gather(
+            [
+                self._queues[index].send_many(
+                    [contents[p] for p in positions], [delays[p] for p in positions]
+                )
+                for index, positions in groups.items()
+            ]
+        )
+
+        ids: List[str] = [""] * len(contents)
+        for (index, positions), group_ids in zip(groups.items(), results):
+            for position, id in zip(positions, group_ids):
+                ids[position] = self._join_id(index, id)
+
+        return ids
+
+    async def _scan(
+        self, count: int, fetch: Callable[[Queue, int], Awaitable[List[Message]]]
+    ) -> List[Message]:
+        start = self._receive_cursor
+        self._receive_cursor = (start + 1) % len(self._queues)
+
+        messages: List[Message] = []
+        for offset in range(len(self._queues)):
+            index = (start + offset) % len(self._queues)
+            received = await fetch(self._queues[index], count - len(messages))
+            messages.extend(self._qualify(index, received))
+
+            if len(messages) >= count:
+                break
+
+        return messages
+
+    async def receive(
+        self, vt: Optional[int] = None, wait_time: Optional[float] = None
+    ) -> Optional[Message]:
+        """See `AIORSMQ.receive_message`."""
+        messages = await self.receive_many(1, vt, wait_time)
+        return messages[0] if messages else None
+
+    async def receive_many(
+        self,
+        count: int,
+        vt: Optional[int] = None,
+        wait_time: Optional[float] = None,
+    ) -> List[Message]:
+        """See `AIORSMQ.receive_messages`.
+
+        When `wait_time` is specified, notifications are awaited from all partitions.
+        """
+        AIORSMQ._validate(vt=vt, count=count, wait_time=wait_time)
+
+        def fetch(queue: Queue, n: int) -> Awaitable[List[Message]]:
+            return queue.receive_many(n, vt)
+
+        messages = await self._scan(count, fetch)
+        if messages or not wait_time:
+            return messages
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + wait_time
+        event = asyncio.Event()
+
+        def notify(data: Union[str, bytes]) -> None:
+            event.set()
+
+        channels = [
+            (client._listener, queue._keys.rt)
+            for client, queue in zip(self._clients, self._queues)
+        ]
+        for listener, channel in channels:
+            await listener.subscribe(channel, notify)
+
+        try:
+            while True:
+                # Clear the event before checking the partitions, so that
+                # notifications published in the meantime are not lost.
+                event.clear()
+
+                messages = await self._scan(count, fetch)
+                remaining = deadline - loop.time()
+                if messages or remaining <= 0:
+                    return messages
+
+                try:
+                    await asyncio.wait_for(
+                        event.wait(), min(remaining, _WAIT_POLL_INTERVAL)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for listener, channel in channels:
+                await listener.unsubscribe(channel, notify)
+
+    def consume(
+        self, prefetch: int = 10, vt: Optional[int] = None, max_backoff: float = 5.0
+    ) -> consumer.MessageIterator:
+        """See `AIORSMQ.consume`."""
+        AIORSMQ._validate(vt=vt, count=prefetch)
+
+        if max_backoff <= 0:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for max_backoff parameter."
+            )
+
+        return consumer.MessageIterator(
+            queue=self, prefetch=prefetch, vt=vt, max_backoff=max_backoff
+        )
+
+    async def pop(self) -> Optional[Message]:
+        """See `AIORSMQ.pop_message`."""
+        messages = await self.pop_many(1)
+        return messages[0] if messages else None
+
+    async def pop_many(self, count: int) -> List[Message]:
+        """See `AIORSMQ.pop_messages`."""
+        AIORSMQ._validate(count=count)
+
+        return await self._scan(count, lambda queue, n: queue.pop_many(n))
+
+    async def delete(self, id: str) -> None:
+        """See `AIORSMQ.delete_message`."""
+        index, id = self._split_id(id)
+        await self._queues[index].delete(id)
+
+    async def delete_many(self, ids: List[str]) -> List[str]:
+        """See `AIORSMQ.delete_messages`."""
+        groups = self._group_ids(ids)
+        results = await _gather(
+            [self._queues[index].delete_many(group) for index, group in groups.items()]
+        )
+
+        deleted = {
+            self._join_id(index, id)
+            for index, group_ids in zip(groups, results)
+            for id in group_ids
+        }
+        return [id for id in ids if id in deleted]
+
+    async def change_visibility(self, id: str, vt: int) -> None:
+        """See `AIORSMQ.change_message_visibility`."""
+        index, id = self._split_id(id)
+        await self._queues[index].change_visibility(id, vt)
+
+    async def change_visibility_many(self, vts: Dict[str, int]) -> List[str]:
+        """See `AIORSMQ.change_messages_visibility`."""
+        groups: Dict[int, Dict[str, int]] = {}
+        for id, vt in vts.items():
+            index, id = self._split_id(id)
+            groups.setdefault(index, {})[id] = vt
+
+        results = await _gather(
+            [
+                self._queues[index].change_visibility_many(group)
+                for index, group in groups.items()
+            ]
+        )
+
+        missing = {
+            self._join_id(index, id)
+            for index, group_ids in zip(groups, results)
+            for id in group_ids
+        }
+        return [id for id in vts if id in missing]
+
+    def _group_ids(self, ids: List[str]) -> Dict[int, List[str]]:
+        groups: Dict[int, List[str]] = {}
+        for id in ids:
+            index, id = self._split_id(id)
+            groups.setdefault(index, []).append(id)
+
+        return groups
@@ -0,0 +1,233 @@
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+import asyncio
+import logging
+
+import aioredis  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Maximum time to block while reading from the pub/sub connection.
+_READ_TIMEOUT = 1.0
+
+Callback = Callable[[Union[str, bytes]], None]
+
+# Receives a channel and a queue's sorted set key, and publishes the queue's size.
+Publish = Callable[[str, str], Awaitable[None]]
+
+
+class RealTimeListener:
+    """Listens for notifications published on Redis channels (such as the real time
+    notifications described in `AIORSMQ`'s `real_time` parameter), sharing a single
+    pub/sub connection among all subscribers.
+
+    Each subscriber provides a callback, which is called with the notification's data
+    every time a notification is published on the subscribed channel.
+    """
+
+    def __init__(self, *, client: aioredis.Redis, client_encoding: str) -> None:
+        self._client = client
+        self._client_encoding = client_encoding
+        self._pubsub: Optional[aioredis.client.PubSub] = None
+        self._task: Optional["asyncio.Future[None]"] = None
+        self._callbacks: Dict[str, Set[Callback]] = {}
+        # Channels the pub/sub connection is currently subscribed to. Subscribing and
+        # unsubscribing are serialized per channel, so that a subscription is never
+        # left behind (or removed) based on outdated callbacks.
+        self._subscribed: Set[str] = set()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+
+    async def subscribe(self, channel: str, callback: Callback) -> None:
+        self._callbacks.setdefault(channel, set()).add(callback)
+
+        lock = self._get_lock(channel)
+        try:
+            async with lock:
+                if channel in self._subscribed or not self._callbacks.get(channel):
+                    # Already subscribed, or unsubscribed while waiting for the lock
+                    return
+
+                if self._pubsub is None:
+                    self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+
+                await self._pubsub.subscribe(channel)
+                self._subscribed.add(channel)
+
+                if self._task is None:
+                    self._task = asyncio.ensure_future(self._run())
+        except BaseException:
+            self._discard(channel, callback)
+            raise
+        finally:
+            self._put_lock(channel)
+
+    async def unsubscribe(self, channel: str, callback: Callback) -> None:
+        if not self._discard(channel, callback):
+            return
+
+        lock = self._get_lock(channel)
+        try:
+            async with lock:
+                # Check again, as another subscriber may have subscribed while waiting
+                # for the lock
+                if self._callbacks.get(channel) or channel not in self._subscribed:
+                    return
+
+                assert self._pubsub is not None
+                await self._pubsub.unsubscribe(channel)
+                self._subscribed.discard(channel)
+        finally:
+            self._put_lock(channel)
+
+        # The reader task keeps running even without subscriptions (until `close` is
+        # called), as subscribers usually come and go repeatedly (e.g. when
+        # receiving messages using `wait_time`).
+
+    def _discard(self, channel: str, callback: Callback) -> bool:
+        # Return `True` if the channel has no callbacks left
+        callbacks = self._callbacks.get(channel)
+        if callbacks is None:
+            return False
+
+        callbacks.discard(callback)
+        if callbacks:
+            return False
+
+        del self._callbacks[channel]
+        return True
+
+    def _get_lock(self, channel: str) -> asyncio.Lock:
+        lock = self._locks.get(channel)
+        if lock is None:
+            lock = self._locks[channel] = asyncio.Lock()
+
+        self._lock_users[channel] = self._lock_users.get(channel, 0) + 1
+        return lock
+
+    def _put_lock(self, channel: str) -> None:
+        # Forget the lock once nobody is using it, so that locks do not accumulate
+        # for channels that are no longer used
+        self._lock_users[channel] -= 1
+        if not self._lock_users[channel]:
+            del self._lock_users[channel]
+            del self._locks[channel]
+
+    async def _run(self) -> None:
+        assert self._pubsub is not None
+
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=_READ_TIMEOUT
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Waiting coroutines never rely exclusively on notifications, so
+                # errors (e.g. a lost connection) are not fatal. Try again later.
+                await asyncio.sleep(_READ_TIMEOUT)
+                continue
+
+            if message is None or message["type"] != "message":
+                continue
+
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode(self._client_encoding)
+
+            # Copy the callbacks, as they may unsubscribe themselves
+            for callback in list(self._callbacks.get(channel, ())):
+                callback(message["data"])
+
+    async def close(self) -> None:
+        if self._task is not None:
+            task = self._task
+            self._task = None
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
+
+        self._callbacks.clear()
+        self._subscribed.clear()
+
+
+class NotificationThrottle:
+    """Limits the rate of real time notifications published for each queue.
+
+    The first message sent to a queue publishes a notification immediately (as part
+    of the send operation itself). Further messages sent within the next `interval`
+    seconds do not publish notifications; instead, a single notification carrying
+    the queue's latest size is published once the interval has elapsed.
+    """
+
+    def __init__(self, *, interval: float, publish: Publish) -> None:
+        self._interval = interval
+        self._publish = publish
+        # Time at which the next notification may be published on each channel
+        self._next: Dict[str, float] = {}
+        self._next_prune = 0.0
+        self._pending: Dict[str, Tuple[asyncio.TimerHandle, str]] = {}
+        self._tasks: Set["asyncio.Future[None]"] = set()
+
+    def acquire(self, channel: str, key_sorted_set: str) -> bool:
+        """Return `True` if a notification should be published right away on the
+        given channel. Otherwise, schedule a delayed notification (if one has not
+        been scheduled already) and return `False`.
+        """
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        next_time = self._next.get(channel, 0.0)
+
+        if now >= next_time:
+            self._prune(now)
+            self._next[channel] = now + self._interval
+            return True
+
+        if channel not in self._pending:
+            timer = loop.call_later(next_time - now, self._publish_pending, channel)
+            self._pending[channel] = (timer, key_sorted_set)
+
+        return False
+
+    def _prune(self, now: float) -> None:
+        # Forget channels that may publish right away again, so that entries do not
+        # accumulate for queues that are no longer used. Pruning at most once per
+        # interval keeps the cost per notification constant.
+        if now < self._next_prune:
+            return
+
+        self._next_prune = now + self._interval
+        self._next = {
+            channel: next_time
+            for channel, next_time in self._next.items()
+            if next_time > now or channel in self._pending
+        }
+
+    def _publish_pending(self, channel: str) -> None:
+        timer, key_sorted_set = self._pending.pop(channel)
+        timer.cancel()
+        self._next[channel] = asyncio.get_event_loop().time() + self._interval
+
+        task = asyncio.ensure_future(self._publish_safe(channel, key_sorted_set))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _publish_safe(self, channel: str, key_sorted_set: str) -> None:
+        try:
+            await self._publish(channel, key_sorted_set)
+        except Exception:
+            # Coroutines waiting for notifications also check the queue periodically,
+            # so a lost notification only delays them.
+            logger.exception("Error while publishing notification on '%s'.", channel)
+
+    async def close(self) -> None:
+        """Publish all pending notifications immediately, and wait until they have
+        been published.
+        """
+        for channel in list(self._pending):
+            self._publish_pending(channel)
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -1,51 +1,196 @@
-from typing import Tuple, Union
+from typing import List, Optional, Tuple, Union
 
-# Taken from:
+# Based on:
 #   https://github.com/smrchy/rsmq/blob/master/_src/index.ts
+#
+# Unlike the JavaScript implementation, the scripts below read the queue's
+# attributes and the server's time themselves, so that each operation requires a
+# single round trip. KEYS[1] is always the queue's sorted set and KEYS[2] the queue's
+# hash. When the queue does not exist, the scripts return `false` (`None` in Python).
+#
+# All keys are passed to the scripts explicitly, so that they can be used with Redis
+# Cluster (see `AIORSMQ`'s `hash_tags` parameter). The only exception are the chunks
+# of offloaded messages expired by POP_MESSAGES, whose keys are read from the queue's
+# hash; they share the queue's hash tag, and are therefore stored in the same slot.
 
-POP_MESSAGE = """local msg = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", KEYS[2], "LIMIT", "0", "1")
-if #msg == 0 then
+# ARGV[1]: maximum number of messages to pop, ARGV[2]: prefix of offloaded messages'
+# contents (optional), which is followed by "<number of chunks>:<chunks key>",
+# ARGV[3]: time to keep the chunks of offloaded messages (in milliseconds). Returns a
+# list of messages.
+POP_MESSAGES = """redis.replicate_commands()
+if redis.call("HEXISTS", KEYS[2], "vt") == 0 then
+    return false
+end
+local time = redis.call("TIME")
+local ts = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local msgs = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ts, "LIMIT", "0", ARGV[1])
+if #msgs == 0 then
     return {}
 end
-redis.call("HINCRBY", KEYS[1] .. ":Q", "totalrecv", 1)
-local mbody = redis.call("HGET", KEYS[1] .. ":Q", msg[1])
-local rc = redis.call("HINCRBY", KEYS[1] .. ":Q", msg[1] .. ":rc", 1)
-local o = {msg[1], mbody, rc}
-if rc==1 then
-    table.insert(o, KEYS[2])
-else
-    local fr = redis.call("HGET", KEYS[1] .. ":Q", msg[1] .. ":fr")
-    table.insert(o, fr)
-end
-redis.call("ZREM", KEYS[1], msg[1])
-redis.call("HDEL", KEYS[1] .. ":Q", msg[1], msg[1] .. ":rc", msg[1] .. ":fr")
-return o"""
+redis.call("HINCRBY", KEYS[2], "totalrecv", #msgs)
+local result = {}
+local fields = {}
+for i = 1, #msgs do
+    local mbody = redis.call("HGET", KEYS[2], msgs[i])
+    local rc = tonumber(redis.call("HGET", KEYS[2], msgs[i] .. ":rc") or "0") + 1
+    local o = {msgs[i], mbody, rc}
+    if rc==1 then
+        table.insert(o, ts)
+    else
+        local fr = redis.call("HGET", KEYS[2], msgs[i] .. ":fr")
+        table.insert(o, fr)
+    end
+    if ARGV[2] and mbody and string.sub(mbody, 1, #ARGV[2]) == ARGV[2] then
+        local key = string.match(string.sub(mbody, #ARGV[2] + 1), "^%d+:(.*)$")
+        redis.call("PEXPIRE", key, ARGV[3])
+    end
+    table.insert(result, o)
+    table.insert(fields, msgs[i])
+    table.insert(fields, msgs[i] .. ":rc")
+    table.insert(fields, msgs[i] .. ":fr")
+    if #fields >= 999 or i == #msgs then
+        redis.call("HDEL", KEYS[2], unpack(fields))
+        fields = {}
+    end
+end
+for i = 1, #msgs, 1000 do
+    redis.call("ZREM", KEYS[1], unpack(msgs, i, math.min(i + 999, #msgs)))
+end
+return result"""
 
-RECEIVE_MESSAGE = """local msg = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", KEYS[2], "LIMIT", "0", "1")
-if #msg == 0 then
+# ARGV[1]: visibility timer (in seconds), or an empty string for the queue's default,
+# ARGV[2]: maximum number of messages to receive. Returns a list of messages.
+RECEIVE_MESSAGES = """redis.replicate_commands()
+local vt = redis.call("HGET", KEYS[2], "vt")
+if not vt then
+    return false
+end
+if ARGV[1] ~= "" then
+    vt = ARGV[1]
+end
+local time = redis.call("TIME")
+local ts = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local msgs = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ts, "LIMIT", "0", ARGV[2])
+if #msgs == 0 then
     return {}
 end
-redis.call("ZADD", KEYS[1], KEYS[3], msg[1])
-redis.call("HINCRBY", KEYS[1] .. ":Q", "totalrecv", 1)
-local mbody = redis.call("HGET", KEYS[1] .. ":Q", msg[1])
-local rc = redis.call("HINCRBY", KEYS[1] .. ":Q", msg[1] .. ":rc", 1)
-local o = {msg[1], mbody, rc}
-if rc==1 then
-    redis.call("HSET", KEYS[1] .. ":Q", msg[1] .. ":fr", KEYS[2])
-    table.insert(o, KEYS[2])
-else
-    local fr = redis.call("HGET", KEYS[1] .. ":Q", msg[1] .. ":fr")
-    table.insert(o, fr)
-end
-return o"""
+local score = ts + tonumber(vt) * 1000
+local members = {}
+for i = 1, #msgs do
+    table.insert(members, score)
+    table.insert(members, msgs[i])
+    if #members == 1000 or i == #msgs then
+        redis.call("ZADD", KEYS[1], unpack(members))
+        members = {}
+    end
+end
+redis.call("HINCRBY", KEYS[2], "totalrecv", #msgs)
+local result = {}
+for i = 1, #msgs do
+    local mbody = redis.call("HGET", KEYS[2], msgs[i])
+    local rc = redis.call("HINCRBY", KEYS[2], msgs[i] .. ":rc", 1)
+    local o = {msgs[i], mbody, rc}
+    if rc==1 then
+        redis.call("HSET", KEYS[2], msgs[i] .. ":fr", ts)
+        table.insert(o, ts)
+    else
+        local fr = redis.call("HGET", KEYS[2], msgs[i] .. ":fr")
+        table.insert(o, fr)
+    end
+    table.insert(result, o)
+end
+return result"""
 
-CHANGE_MESSAGE_VISIBILITY = """local msg = redis.call("ZSCORE", KEYS[1], KEYS[2])
-if not msg then
-    return 0
+# Arguments are pairs of values: message ID and new visibility timer (in seconds).
+# Returns the list of message IDs that do not exist.
+CHANGE_MESSAGES_VISIBILITY = """redis.replicate_commands()
+if redis.call("HEXISTS", KEYS[2], "vt") == 0 then
+    return false
+end
+local time = redis.call("TIME")
+local ts = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local missing = {}
+local members = {}
+for i = 1, #ARGV, 2 do
+    if redis.call("ZSCORE", KEYS[1], ARGV[i]) then
+        table.insert(members, ts + tonumber(ARGV[i + 1]) * 1000)
+        table.insert(members, ARGV[i])
+    else
+        table.insert(missing, ARGV[i])
+    end
+    if #members >= 1000 or (i + 1 >= #ARGV and #members > 0) then
+        redis.call("ZADD", KEYS[1], unpack(members))
+        members = {}
+    end
+end
+return missing"""
+
+# Not part of the JavaScript implementation. Message IDs are built the same way as in
+# `compat.message_uid`, with the random suffixes being provided by the caller. Each
+# message's timestamp is increased by one microsecond, so that messages sent in the
+# same batch keep their order. ARGV[1]: "1" to publish a real time notification,
+# ARGV[2]: real time channel. The rest of the arguments are groups of three values
+# (one per message): random ID suffix, delay (in seconds) or an empty string for the
+# queue's default, and contents. Returns the list of message IDs, or the queue's
+# maximum message size if any of the messages is too large.
+SEND_MESSAGES = """redis.replicate_commands()
+local conf = redis.call("HMGET", KEYS[2], "delay", "maxsize")
+if not conf[1] or not conf[2] then
+    return false
+end
+local maxsize = tonumber(conf[2])
+if maxsize ~= -1 then
+    for i = 5, #ARGV, 3 do
+        if #ARGV[i] > maxsize then
+            return maxsize
+        end
+    end
+end
+local function base36(n)
+    local alphabet = "0123456789abcdefghijklmnopqrstuvwxyz"
+    local s = ""
+    repeat
+        local d = n % 36
+        s = string.sub(alphabet, d + 1, d + 1) .. s
+        n = (n - d) / 36
+    until n == 0
+    return s
+end
+local time = redis.call("TIME")
+local us = tonumber(time[1]) * 1000000 + tonumber(time[2])
+local ids = {}
+local members = {}
+local fields = {}
+for i = 3, #ARGV, 3 do
+    local id = base36(us) .. ARGV[i]
+    local delay = tonumber(conf[1])
+    if ARGV[i + 1] ~= "" then
+        delay = tonumber(ARGV[i + 1])
+    end
+    table.insert(ids, id)
+    table.insert(members, math.floor(us / 1000) + delay * 1000)
+    table.insert(members, id)
+    table.insert(fields, id)
+    table.insert(fields, ARGV[i + 2])
+    if #members >= 1000 or i + 2 >= #ARGV then
+        redis.call("ZADD", KEYS[1], unpack(members))
+        redis.call("HSET", KEYS[2], unpack(fields))
+        members = {}
+        fields = {}
+    end
+    us = us + 1
+end
+redis.call("HINCRBY", KEYS[2], "totalsent", #ids)
+if ARGV[1] == "1" then
+    redis.call("PUBLISH", ARGV[2], redis.call("ZCARD", KEYS[1]))
 end
-redis.call("ZADD", KEYS[1], KEYS[3], KEYS[2])
-return 1"""
+return ids"""
 
+# ARGV[1]: real time notification channel. Publishes the current number of messages
+# in the queue, without checking whether the queue exists.
+PUBLISH_QUEUE_SIZE = """redis.call("PUBLISH", ARGV[1], redis.call("ZCARD", KEYS[1]))"""
 
-MsgRecv = Tuple[str, Union[str, bytes], int, str]
-MsgVisibility = int
+MsgRecv = Tuple[Union[str, bytes], Union[str, bytes], int, Union[str, bytes, int]]
+MsgRecvBatch = List[MsgRecv]
+MsgVisibilityBatch = Optional[List[Union[str, bytes]]]
+MsgSendBatch = Union[None, int, List[Union[str, bytes]]]
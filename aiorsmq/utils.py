@@ -1,4 +1,5 @@
-from typing import TypeVar, Optional
+from typing import Optional, TypeVar
+import codecs
 
 T = TypeVar("T")
 
@@ -8,3 +9,31 @@ def ensure(value: Optional[T]) -> T:
         raise RuntimeError("Expected a non-None value to be present.")
 
     return value
+
+
+# `str.isascii` is not available in Python 3.6
+_HAS_ISASCII = hasattr(str, "isascii")
+
+# Encodings in which ASCII strings take one byte per character
+_ASCII_COMPATIBLE = frozenset(["utf-8", "ascii", "iso8859-1"])
+
+
+def normalize_encoding(encoding: str) -> str:
+    """Return the normalized name of `encoding`, as expected by `encoded_length`.
+
+    Raises:
+        LookupError: When the encoding does not exist.
+    """
+    return codecs.lookup(encoding).name
+
+
+def encoded_length(value: str, encoding: str) -> int:
+    """Return the length of `value` once encoded, in bytes. `encoding` must be a
+    normalized encoding name (see `normalize_encoding`).
+    """
+    # Avoid encoding ASCII strings (by far the most common case) only to measure
+    # them.
+    if _HAS_ISASCII and encoding in _ASCII_COMPATIBLE and value.isascii():
+        return len(value)
+
+    return len(value.encode(encoding))
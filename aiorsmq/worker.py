@@ -0,0 +1,217 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Set, TYPE_CHECKING
+import asyncio
+import logging
+
+from aiorsmq import exceptions
+
+if TYPE_CHECKING:
+    from aiorsmq.aiorsmq import AIORSMQ, Message
+    from aiorsmq.consumer import MessageIterator
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[["Message"], Awaitable[None]]
+
+
+class Worker:
+    """Processes the messages of a message queue using a coroutine function, with
+    bounded concurrency.
+
+    Messages are deleted from the queue (in batches) once the handler returns
+    successfully. If the handler raises an exception, the message is left in the
+    queue, so that it will be received again once its visibility timer expires.
+    While a message is waiting in the local buffer or being processed by the
+    handler, its visibility timer is periodically extended so that other consumers
+    will not receive it.
+    """
+
+    def __init__(
+        self,
+        *,
+        rsmq: "AIORSMQ",
+        queue_name: str,
+        handler: Handler,
+        concurrency: int = 10,
+        prefetch: Optional[int] = None,
+        vt: Optional[int] = None,
+        ack_batch_size: int = 100,
+        ack_interval: float = 0.1,
+    ) -> None:
+        """Initialize a `Worker` object.
+
+        Args:
+            rsmq: `AIORSMQ` object to use for receiving and deleting messages.
+            queue_name: Name of the message queue.
+            handler: Coroutine function to call for each message received.
+            concurrency: Maximum number of handlers to run at the same time.
+            prefetch: Maximum number of received messages to keep in a local buffer
+                while waiting for a handler to become available (see
+                `AIORSMQ.consume`). By default, the value of `concurrency` is used.
+            vt: Visibility timer to use when receving messages (in seconds). If not
+                specified, the queue's visiblity timer value will be used. While a
+                message is buffered or its handler is running, its visibility timer
+                will be extended every `vt / 2` seconds.
+            ack_batch_size: Maximum number of successfully processed messages to
+                delete at once.
+            ack_interval: Maximum time to wait before deleting successfully processed
+                messages (in seconds).
+
+        Raises:
+            exceptions.InvalidValueException: When a given argument contains an invalid
+                value.
+        """
+        if concurrency < 1:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for concurrency parameter."
+            )
+
+        if ack_batch_size < 1:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for ack_batch_size parameter."
+            )
+
+        if ack_interval <= 0:
+            raise exceptions.InvalidValueException(
+                "Incorrect value for ack_interval parameter."
+            )
+
+        self._queue = rsmq.queue(queue_name)
+        self._handler = handler
+        self._concurrency = concurrency
+        self._prefetch = concurrency if prefetch is None else prefetch
+        self._vt = vt
+        self._ack_batch_size = ack_batch_size
+        self._ack_interval = ack_interval
+
+        self._messages: Optional["MessageIterator"] = None
+        self._in_flight: Dict[str, "Message"] = {}
+        self._tasks: Set["asyncio.Future[None]"] = set()
+        self._acks: List[str] = []
+        self._stopping = False
+        self._done: Optional[asyncio.Event] = None
+
+    async def run(self) -> None:
+        """Receive and process messages until `stop` is called.
+
+        Raises:
+            exceptions.QueueNotFoundException: When the specified queue does not exist.
+        """
+        self._done = asyncio.Event()
+
+        try:
+            vt = self._vt
+            if vt is None:
+                vt = (await self._queue.get_attributes()).vt
+
+            self._messages = self._queue.consume(prefetch=self._prefetch, vt=vt)
+            background = [asyncio.ensure_future(self._flush_acks_periodically())]
+            if vt > 0:
+                background.append(asyncio.ensure_future(self._heartbeat(vt)))
+
+            try:
+                await self._process_messages(self._messages)
+            finally:
+                await self._messages.close()
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+
+                for task in background:
+                    task.cancel()
+
+                await asyncio.gather(*background, return_exceptions=True)
+                await self._flush_acks()
+        finally:
+            self._done.set()
+
+    async def stop(self) -> None:
+        """Stop receiving messages, and wait until all running handlers have
+        finished and all processed messages have been deleted.
+        """
+        self._stopping = True
+
+        if self._messages is not None:
+            await self._messages.close()
+
+        if self._done is not None:
+            await self._done.wait()
+
+    async def _process_messages(self, messages: "MessageIterator") -> None:
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        while not self._stopping:
+            await semaphore.acquire()
+
+            try:
+                message = await messages.__anext__()
+            except StopAsyncIteration:
+                semaphore.release()
+                break
+
+            task = asyncio.ensure_future(self._process(message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda _: semaphore.release())
+
+    async def _process(self, message: "Message") -> None:
+        self._in_flight[message.id] = message
+
+        try:
+            await self._handler(message)
+        except Exception:
+            logger.exception(
+                "Error while processing message '%s' from queue '%s'.",
+                message.id,
+                self._queue.name,
+            )
+            return
+        finally:
+            self._in_flight.pop(message.id, None)
+
+        self._acks.append(message.id)
+        if len(self._acks) >= self._ack_batch_size:
+            await self._flush_acks()
+
+    async def _flush_acks(self) -> None:
+        if not self._acks:
+            return
+
+        ids = self._acks
+        self._acks = []
+
+        try:
+            await self._queue.delete_many(ids)
+        except Exception:
+            # The messages will be received again once their visibility timer
+            # expires.
+            logger.exception(
+                "Error while deleting %d messages from queue '%s'.",
+                len(ids),
+                self._queue.name,
+            )
+
+    async def _flush_acks_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._ack_interval)
+            await self._flush_acks()
+
+    async def _heartbeat(self, vt: int) -> None:
+        while True:
+            await asyncio.sleep(vt / 2)
+
+            # Messages waiting in the iterator's buffer for a free handler must not
+            # expire either, or they would be received by other consumers.
+            ids = list(self._in_flight)
+            if self._messages is not None:
+                ids.extend(self._messages._buffered_ids())
+
+            if not ids:
+                continue
+
+            try:
+                await self._queue.change_visibility_many({id: vt for id in ids})
+            except Exception:
+                logger.exception(
+                    "Error while extending the visibility timer of %d messages from "
+                    "queue '%s'.",
+                    len(ids),
+                    self._queue.name,
+                )
@@ -0,0 +1,79 @@
+"""Measure the overhead of hooks (see `aiorsmq.hooks`) on sending and receiving
+messages.
+
+Usage (from the repository's root directory):
+    python -m benchmarks.bench_hooks [--redis-url URL] [--count N] [--output FILE]
+"""
+
+from typing import Any, Dict, List
+import timeit
+
+from aiorsmq import hooks
+from aiorsmq.hooks import Hook
+
+from benchmarks import common
+
+QUEUE = "hooks"
+HOOK_COUNTS = [0, 1, 5]
+
+
+def dispatch_overhead(count: int) -> List[Dict[str, Any]]:
+    # Cost of calling all hooks for a single message, without Redis
+    results = []
+    contents = ["foobar"]
+    ids = ["0" * 32]
+
+    for n in HOOK_COUNTS:
+        registered = [Hook() for _ in range(n)]
+
+        def call() -> None:
+            if registered:
+                hooks.before_send(registered, QUEUE, contents)
+                hooks.after_send(registered, QUEUE, contents, ids)
+                hooks.after_receive(registered, QUEUE, [])
+
+        seconds = timeit.timeit(call, number=count * 100)
+        results.append(
+            {
+                "case": "dispatch",
+                "hooks": n,
+                "ns_per_message": seconds / (count * 100) * 1e9,
+            }
+        )
+
+    return results
+
+
+async def round_trip_overhead(url: str, count: int) -> List[Dict[str, Any]]:
+    # Cost of hooks relative to sending and receiving messages
+    results = []
+
+    for n in HOOK_COUNTS:
+        await common.clean(url)
+        rsmq = common.rsmq(url, hooks=[Hook() for _ in range(n)])
+        await rsmq.create_queue(QUEUE)
+        queue = rsmq.queue(QUEUE)
+
+        send = await common.measure(lambda i: queue.send(b"foobar"), count)
+        receive = await common.measure(lambda i: queue.receive(), count)
+
+        results.append({"case": "send_message", "hooks": n, **send})
+        results.append({"case": "receive_message", "hooks": n, **receive})
+        await rsmq.quit()
+
+    await common.clean(url)
+    return results
+
+
+async def main() -> None:
+    parser = common.argument_parser(__doc__.splitlines()[0])
+    args = parser.parse_args()
+
+    results = dispatch_overhead(args.count)
+    results += await round_trip_overhead(args.redis_url, args.count)
+
+    common.write_results("hooks", results, args.output)
+
+
+if __name__ == "__main__":
+    common.run(main())
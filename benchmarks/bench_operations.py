@@ -0,0 +1,178 @@
+"""Measure the throughput and latency of sending, receiving, popping and deleting
+messages.
+
+Usage (from the repository's root directory):
+    python -m benchmarks.bench_operations [--redis-url URL] [--count N]
+        [--payload-sizes 16,1024] [--concurrency 1,16] [--batch-sizes 10,100]
+        [--output FILE]
+
+Compare the results of two runs using `benchmarks.compare`.
+"""
+
+from typing import Any, Dict, List
+import argparse
+
+from aiorsmq import AIORSMQ, Queue
+
+from benchmarks import common
+
+QUEUE = "operations"
+
+# Number of messages to send per round trip when filling the queue
+_FILL_BATCH = 1000
+
+Result = Dict[str, Any]
+
+
+def int_list(value: str) -> List[int]:
+    try:
+        return [int(v) for v in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid list of integers: '{value}'")
+
+
+async def fill(queue: Queue, count: int, payload: bytes) -> None:
+    for start in range(0, count, _FILL_BATCH):
+        await queue.send_many([payload] * min(_FILL_BATCH, count - start))
+
+
+async def create(url: str, **kwargs: Any) -> AIORSMQ:
+    await common.clean(url)
+    rsmq = common.rsmq(url, **kwargs)
+    await rsmq.create_queue(QUEUE, max_size=-1)
+
+    return rsmq
+
+
+async def single_operations(
+    url: str, count: int, payload_size: int, concurrency: int, real_time: bool
+) -> List[Result]:
+    rsmq = await create(url, real_time=real_time)
+    queue = rsmq.queue(QUEUE)
+    payload = b"x" * payload_size
+    case = {
+        "payload_size": payload_size,
+        "concurrency": concurrency,
+        "real_time": real_time,
+        "batch_size": 1,
+    }
+    results = []
+
+    send = await common.measure(lambda i: queue.send(payload), count, concurrency)
+    results.append({"operation": "send_message", **case, **send})
+
+    ids: List[str] = []
+
+    async def receive(i: int) -> None:
+        message = await queue.receive()
+        if message is not None:
+            ids.append(message.id)
+
+    stats = await common.measure(receive, count, concurrency)
+    results.append({"operation": "receive_message", **case, **stats})
+
+    stats = await common.measure(lambda i: queue.delete(ids[i]), len(ids), concurrency)
+    results.append({"operation": "delete_message", **case, **stats})
+
+    await fill(queue, count, payload)
+    stats = await common.measure(lambda i: queue.pop(), count, concurrency)
+    results.append({"operation": "pop_message", **case, **stats})
+
+    await rsmq.quit()
+    return results
+
+
+def per_message(stats: Dict[str, float], batch_size: int) -> Dict[str, float]:
+    return {**stats, "messages_per_sec": stats["ops_per_sec"] * batch_size}
+
+
+async def batch_operations(
+    url: str, count: int, payload_size: int, batch_size: int
+) -> List[Result]:
+    rsmq = await create(url)
+    queue = rsmq.queue(QUEUE)
+    payload = b"x" * payload_size
+    batch = [payload] * batch_size
+    calls = max(1, count // batch_size)
+    case = {
+        "payload_size": payload_size,
+        "concurrency": 1,
+        "real_time": False,
+        "batch_size": batch_size,
+    }
+    results = []
+
+    stats = await common.measure(lambda i: queue.send_many(batch), calls)
+    results.append(
+        {"operation": "send_messages", **case, **per_message(stats, batch_size)}
+    )
+
+    ids: List[List[str]] = []
+
+    async def receive(i: int) -> None:
+        ids.append([m.id for m in await queue.receive_many(batch_size)])
+
+    stats = await common.measure(receive, calls)
+    results.append(
+        {"operation": "receive_messages", **case, **per_message(stats, batch_size)}
+    )
+
+    stats = await common.measure(lambda i: queue.delete_many(ids[i]), calls)
+    results.append(
+        {"operation": "delete_messages", **case, **per_message(stats, batch_size)}
+    )
+
+    await fill(queue, calls * batch_size, payload)
+    stats = await common.measure(lambda i: queue.pop_many(batch_size), calls)
+    results.append(
+        {"operation": "pop_messages", **case, **per_message(stats, batch_size)}
+    )
+
+    await rsmq.quit()
+    return results
+
+
+async def main() -> None:
+    parser = common.argument_parser(__doc__.splitlines()[0])
+    parser.add_argument(
+        "--payload-sizes",
+        type=int_list,
+        default=[16, 1024, 16384],
+        help="Comma-separated payload sizes, in bytes (default: 16,1024,16384).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int_list,
+        default=[1, 16, 64],
+        help="Comma-separated numbers of concurrent callers (default: 1,16,64).",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=int_list,
+        default=[10, 100],
+        help="Comma-separated batch sizes for the *_messages methods "
+        "(default: 10,100).",
+    )
+    args = parser.parse_args()
+
+    results: List[Result] = []
+    for real_time in [False, True]:
+        for payload_size in args.payload_sizes:
+            for concurrency in args.concurrency:
+                results += await single_operations(
+                    args.redis_url, args.count, payload_size, concurrency, real_time
+                )
+
+    for payload_size in args.payload_sizes:
+        for batch_size in args.batch_sizes:
+            results += await batch_operations(
+                args.redis_url, args.count, payload_size, batch_size
+            )
+
+    await common.clean(args.redis_url)
+
+    common.write_results("operations", results, args.output)
+
+
+if __name__ == "__main__":
+    common.run(main())
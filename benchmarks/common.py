@@ -0,0 +1,126 @@
+"""Helpers shared by the benchmarks.
+
+Benchmarks run against a local Redis server (see `--redis-url`), and use the
+namespace `aiorsmq-bench`, whose keys are deleted before and after each run.
+"""
+
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+
+import aioredis  # type: ignore
+
+from aiorsmq import AIORSMQ, __version__
+
+NAMESPACE = "aiorsmq-bench"
+
+Operation = Callable[[int], Awaitable[Any]]
+
+
+def argument_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--redis-url",
+        default="redis://localhost:6379",
+        help="URL of the Redis server to use (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=2000,
+        help="Number of operations to run per case (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--output",
+        help="Path of the JSON file to write results to. By default, results are "
+        "written to standard output.",
+    )
+
+    return parser
+
+
+def redis_client(url: str) -> aioredis.Redis:
+    return aioredis.from_url(url, decode_responses=False)
+
+
+def rsmq(url: str, **kwargs: Any) -> AIORSMQ:
+    return AIORSMQ(client=redis_client(url), namespace=NAMESPACE, **kwargs)
+
+
+async def clean(url: str) -> None:
+    client = redis_client(url)
+    keys = [key async for key in client.scan_iter(match=NAMESPACE + ":*")]
+    if keys:
+        await client.delete(*keys)
+
+    await client.close()
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def measure(
+    operation: Operation, count: int, concurrency: int = 1
+) -> Dict[str, float]:
+    """Call `operation` `count` times (passing the index of each call), from
+    `concurrency` coroutines at once, and return the throughput and latency
+    percentiles.
+    """
+    latencies: List[float] = []
+    indexes = iter(range(count))
+
+    async def worker() -> None:
+        for index in indexes:
+            start = time.perf_counter()
+            await operation(index)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "ops": count,
+        "seconds": elapsed,
+        "ops_per_sec": count / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def write_results(
+    name: str, results: List[Dict[str, Any]], output: Optional[str]
+) -> None:
+    document = {
+        "benchmark": name,
+        "aiorsmq": __version__,
+        "python": platform.python_version(),
+        "time": int(time.time()),
+        "results": results,
+    }
+
+    text = json.dumps(document, indent=2)
+    if output is None:
+        sys.stdout.write(text + "\n")
+    else:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+
+
+def run(main: Coroutine[Any, Any, None]) -> None:
+    # `asyncio.run` is not available in Python 3.6
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main)
+    finally:
+        loop.close()
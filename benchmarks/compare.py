@@ -0,0 +1,97 @@
+"""Compare two benchmark result files, e.g. produced by different versions of aiorsmq.
+
+Usage (from the repository's root directory):
+    python -m benchmarks.compare BASELINE.json CURRENT.json [--threshold PERCENT]
+
+Exits with status 1 if any case's throughput decreased, or its p99 latency
+increased, by more than the threshold.
+"""
+
+from typing import Any, Dict, List, Tuple
+import argparse
+import json
+import sys
+
+# Fields containing measurements; all other fields identify the case
+_MEASUREMENTS = {
+    "ops",
+    "seconds",
+    "ops_per_sec",
+    "messages_per_sec",
+    "p50_ms",
+    "p99_ms",
+    "ns_per_message",
+}
+
+Key = Tuple[Tuple[str, Any], ...]
+
+
+def load(path: str) -> Dict[Key, Dict[str, Any]]:
+    with open(path) as f:
+        document = json.load(f)
+
+    results = {}
+    for result in document["results"]:
+        key = tuple(sorted((k, v) for k, v in result.items() if k not in _MEASUREMENTS))
+        results[key] = result
+
+    return results
+
+
+def change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(
+    baseline: Dict[Key, Dict[str, Any]],
+    current: Dict[Key, Dict[str, Any]],
+    threshold: float,
+) -> Tuple[List[str], bool]:
+    lines = []
+    regressed = False
+
+    for key, after in current.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+
+        case = " ".join(f"{k}={v}" for k, v in key)
+        if "ops_per_sec" in after:
+            throughput = change(before["ops_per_sec"], after["ops_per_sec"])
+            latency = change(before["p99_ms"], after["p99_ms"])
+            worse = throughput < -threshold or latency > threshold
+            lines.append(
+                f"{'!' if worse else ' '} {case}: ops/s {throughput:+.1f}%, "
+                f"p99 {latency:+.1f}%"
+            )
+        else:
+            cost = change(before["ns_per_message"], after["ns_per_message"])
+            worse = cost > threshold
+            lines.append(f"{'!' if worse else ' '} {case}: ns/message {cost:+.1f}%")
+
+        regressed = regressed or worse
+
+    return lines, regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", help="Path of the baseline results.")
+    parser.add_argument("current", help="Path of the results to compare.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Maximum change tolerated, in percent (default: %(default)s).",
+    )
+    args = parser.parse_args()
+
+    lines, regressed = compare(load(args.baseline), load(args.current), args.threshold)
+    for line in lines:
+        print(line)
+
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
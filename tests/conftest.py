@@ -116,15 +116,25 @@ async def redis_client_bytes() -> AsyncGenerator[aioredis.Redis, None]:
 
 
 @pytest.fixture
-def client(redis_client: aioredis.Redis) -> AIORSMQ:
-    return AIORSMQ(
+async def client(redis_client: aioredis.Redis) -> AsyncGenerator[AIORSMQ, None]:
+    client = AIORSMQ(
         client=redis_client, client_encoding="utf-8", namespace=TEST_NS, real_time=True
     )
 
+    yield client
+
+    await client.quit()
+
 
 @pytest.fixture
-def client_bytes(redis_client_bytes: aioredis.Redis) -> AIORSMQ:
-    return AIORSMQ(client=redis_client_bytes, namespace=TEST_NS, real_time=True)
+async def client_bytes(
+    redis_client_bytes: aioredis.Redis,
+) -> AsyncGenerator[AIORSMQ, None]:
+    client = AIORSMQ(client=redis_client_bytes, namespace=TEST_NS, real_time=True)
+
+    yield client
+
+    await client.quit()
 
 
 @pytest.fixture
@@ -1,3 +1,4 @@
+import array
 import asyncio
 
 import pytest
@@ -12,7 +13,7 @@ from aiorsmq.exceptions import (
     InvalidValueException,
 )
 
-from tests.conftest import TEST_NS  # type: ignore
+from tests.conftest import HOST, TEST_NS  # type: ignore
 
 pytestmark = pytest.mark.asyncio
 
@@ -139,6 +140,49 @@ async def test_send_message_rt(
     await pubsub.close()
 
 
+async def test_send_message_rt_interval(
+    redis_client: aioredis.Redis, client: AIORSMQ, queue: str
+):
+    rsmq = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=True),
+        namespace=TEST_NS,
+        real_time=True,
+        real_time_interval=0.2,
+    )
+
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    await pubsub.subscribe(compat.queue_rt(TEST_NS, queue))
+
+    for i in range(10):
+        await rsmq.send_message(queue, str(i))
+
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + 1
+    values = []
+    while loop.time() < deadline:
+        value = await pubsub.get_message(timeout=0.1)
+        if value:
+            values.append(value["data"])
+
+    assert values == ["1", "10"]
+
+    # Pending notifications are published when quitting
+    await rsmq.send_message(queue, "foo")
+    await rsmq.send_message(queue, "bar")
+    await rsmq.quit()
+
+    values = []
+    while len(values) < 2:
+        value = await pubsub.get_message(timeout=1)
+        assert value
+        values.append(value["data"])
+
+    assert values == ["11", "12"]
+
+    await pubsub.unsubscribe()
+    await pubsub.close()
+
+
 async def test_send_message_delay(client: AIORSMQ, queue: str):
     await client.send_message(queue, "foobar", delay=30)
     assert not await client.receive_message(queue)
@@ -161,6 +205,20 @@ async def test_send_message_bytes(client_bytes: AIORSMQ, queue: str):
     assert received.contents == message
 
 
+async def test_send_message_bytes_id(client_bytes: AIORSMQ, queue: str):
+    uid = await client_bytes.send_message(queue, b"foobar")
+    assert isinstance(uid, str)
+    assert len(uid) == 32
+
+
+async def test_receive_message_bytes_id(client_bytes: AIORSMQ, queue: str):
+    uid = await client_bytes.send_message(queue, b"foobar")
+
+    received = await client_bytes.receive_message(queue)
+    assert received
+    assert received.id == uid
+
+
 async def test_send_message_bytes_failure_max_size(client_bytes: AIORSMQ, queue: str):
     await client_bytes.set_queue_attributes(queue, max_size=1024)
 
@@ -170,6 +228,116 @@ async def test_send_message_bytes_failure_max_size(client_bytes: AIORSMQ, queue:
         await client_bytes.send_message(queue, message)
 
 
+@pytest.mark.parametrize("wrap", [bytearray, memoryview])
+async def test_send_message_bytes_like(client_bytes: AIORSMQ, queue: str, wrap):
+    uid = await client_bytes.send_message(queue, wrap(b"\xFE\xDE" * 100))
+    await client_bytes.send_messages(queue, [wrap(b"foo"), wrap(b"bar")])
+
+    messages = await client_bytes.receive_messages(queue, 10)
+    assert [m.contents for m in messages] == [b"\xFE\xDE" * 100, b"foo", b"bar"]
+    assert messages[0].id == uid
+
+
+async def test_send_message_memoryview_items(client_bytes: AIORSMQ, queue: str):
+    data = array.array("I", range(100))
+    await client_bytes.send_message(queue, memoryview(data))
+
+    # The connection must still be usable after sending the view
+    assert (await client_bytes.get_queue_attributes(queue)).messages == 1
+
+    message = await client_bytes.receive_message(queue)
+    assert message and message.contents == data.tobytes()
+
+
+async def test_send_message_memoryview_failure_non_contiguous(
+    client_bytes: AIORSMQ, queue: str
+):
+    with pytest.raises(InvalidValueException):
+        await client_bytes.send_message(queue, memoryview(b"foobar")[::2])
+
+
+async def test_send_message_bytes_like_failure_max_size(
+    client_bytes: AIORSMQ, queue: str
+):
+    await client_bytes.set_queue_attributes(queue, max_size=1024)
+
+    with pytest.raises(InvalidValueException):
+        await client_bytes.send_message(queue, memoryview(b"a" * 1025))
+
+    await client_bytes.send_message(queue, memoryview(b"a" * 1024))
+
+
+async def test_receive_message_lazy_fields(client_bytes: AIORSMQ, queue: str):
+    uid = await client_bytes.send_message(queue, b"foobar")
+
+    message = await client_bytes.receive_message(queue)
+    assert message
+
+    assert message.id == uid
+    assert message.sent == compat.base36_decode(uid[:10]) / 1000
+    assert isinstance(message.fr, int) and message.fr > 0
+
+
+async def test_send_messages(redis_client: aioredis.Redis, client: AIORSMQ, queue: str):
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    await pubsub.subscribe(compat.queue_rt(TEST_NS, queue))
+
+    count = 2500
+    contents = [str(i) for i in range(count)]
+    uids = await client.send_messages(queue, contents)
+    assert len(set(uids)) == count
+
+    value = None
+    while not value:
+        value = await pubsub.get_message()
+
+    assert value["data"] == str(count)
+
+    messages = await client.receive_messages(queue, count)
+    assert [m.id for m in messages] == uids
+    assert [m.contents for m in messages] == contents
+
+    attributes = await client.get_queue_attributes(queue)
+    assert attributes.total_sent == count
+
+    await pubsub.unsubscribe()
+    await pubsub.close()
+
+
+async def test_send_messages_delay(client: AIORSMQ, queue: str):
+    uids = await client.send_messages(queue, ["a", "b", "c"], delay=[None, 30, 0])
+
+    messages = await client.receive_messages(queue, 3)
+    assert [m.id for m in messages] == [uids[0], uids[2]]
+
+    await client.send_messages(queue, ["d", "e"], delay=30)
+    assert await client.receive_messages(queue, 3) == []
+
+
+async def test_send_messages_empty(client: AIORSMQ, queue: str):
+    assert await client.send_messages(queue, []) == []
+
+
+async def test_send_messages_failure(client: AIORSMQ, qname: str):
+    with pytest.raises(QueueNotFoundException):
+        await client.send_messages(qname, ["foobar"])
+
+
+async def test_send_messages_failure_max_size(client: AIORSMQ, queue: str):
+    await client.set_queue_attributes(queue, max_size=1024)
+
+    with pytest.raises(InvalidValueException):
+        await client.send_messages(queue, ["foobar", "a" * 1025])
+
+    assert (await client.get_queue_attributes(queue)).messages == 0
+
+
+@pytest.mark.parametrize("delay", [-1, [0, -1], [0]])
+async def test_send_messages_failure_arg(client: AIORSMQ, queue: str, delay):
+    with pytest.raises(InvalidValueException):
+        await client.send_messages(queue, ["foo", "bar"], delay=delay)
+
+
 async def test_receive_message_empty(client: AIORSMQ, queue: str):
     msg = await client.receive_message(queue)
     assert msg is None
@@ -188,6 +356,74 @@ async def test_receive_message(client: AIORSMQ, queue: str):
     assert msg.sent > 0
 
 
+async def test_receive_message_wait_time(client: AIORSMQ, queue: str):
+    loop = asyncio.get_event_loop()
+    task = asyncio.ensure_future(client.receive_message(queue, wait_time=5))
+
+    await asyncio.sleep(0.2)
+    start = loop.time()
+    uid = await client.send_message(queue, "foobar")
+
+    msg = await task
+    assert msg is not None
+    assert msg.id == uid
+    assert loop.time() - start < 0.5
+
+
+async def test_receive_message_wait_time_expired(client: AIORSMQ, queue: str):
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+
+    assert await client.receive_message(queue, wait_time=0.3) is None
+    assert loop.time() - start >= 0.3
+
+
+async def test_receive_message_wait_time_delay(client: AIORSMQ, queue: str):
+    uid = await client.send_message(queue, "foobar", delay=1)
+
+    msg = await client.receive_message(queue, wait_time=3)
+    assert msg is not None
+    assert msg.id == uid
+
+
+async def test_receive_messages_wait_time_shared(
+    redis_client: aioredis.Redis, client: AIORSMQ, queue: str
+):
+    tasks = [
+        asyncio.ensure_future(client.receive_messages(queue, 2, wait_time=5))
+        for _ in range(3)
+    ]
+
+    await asyncio.sleep(0.2)
+    channel = compat.queue_rt(TEST_NS, queue)
+    assert await redis_client.pubsub_numsub(channel) == [(channel, 1)]
+
+    await client.send_messages(queue, ["foo", "bar"])
+    await client.send_messages(queue, ["baz"])
+    await asyncio.sleep(0.2)
+    await client.send_messages(queue, ["qux"])
+
+    results = await asyncio.gather(*tasks)
+    assert sorted(len(r) for r in results) == [1, 1, 2]
+
+    for _ in range(10):
+        if await redis_client.pubsub_numsub(channel) == [(channel, 0)]:
+            break
+        await asyncio.sleep(0.1)
+    else:
+        pytest.fail("Channel still has subscribers.")
+
+
+async def test_receive_message_wait_time_failure(client: AIORSMQ, qname: str):
+    with pytest.raises(QueueNotFoundException):
+        await client.receive_message(qname, wait_time=1)
+
+    await client.create_queue(qname)
+
+    with pytest.raises(InvalidValueException):
+        await client.receive_message(qname, wait_time=-1)
+
+
 async def test_receive_message_sent_order(client: AIORSMQ, queue: str):
     count = 3
 
@@ -220,6 +456,16 @@ async def test_receive_message_twice_vt_expired(client: AIORSMQ, queue: str):
     assert msg.rc == 2
 
 
+async def test_receive_message_twice_fr(client: AIORSMQ, queue: str):
+    await client.send_message(queue, "foobar")
+    first = await client.receive_message(queue, vt=0)
+    second = await client.receive_message(queue, vt=0)
+
+    assert first is not None and second is not None
+    assert first.fr == second.fr
+    assert second.rc == 2
+
+
 async def test_receive_message_twice_vt_expired_queue_configured(
     client: AIORSMQ, qname: str
 ):
@@ -245,6 +491,51 @@ async def test_receive_message_failure_arg(client: AIORSMQ, queue: str, vt: int)
         await client.receive_message(queue, vt)
 
 
+async def test_receive_messages(client: AIORSMQ, queue: str):
+    uids = [await client.send_message(queue, str(i)) for i in range(5)]
+
+    messages = await client.receive_messages(queue, 3)
+    assert [m.id for m in messages] == uids[:3]
+    assert [m.contents for m in messages] == ["0", "1", "2"]
+    assert all(m.rc == 1 and m.fr > 0 for m in messages)
+
+    messages = await client.receive_messages(queue, 10)
+    assert [m.id for m in messages] == uids[3:]
+
+    assert await client.receive_messages(queue, 10) == []
+    assert (await client.get_queue_attributes(queue)).total_recv == 5
+
+
+async def test_receive_messages_vt_expired(client: AIORSMQ, queue: str):
+    count = 1500
+    for i in range(count):
+        await client.send_message(queue, str(i))
+
+    messages = await client.receive_messages(queue, count, vt=0)
+    assert len(messages) == count
+
+    messages = await client.receive_messages(queue, count)
+    assert len(messages) == count
+    assert all(m.rc == 2 for m in messages)
+
+    assert await client.receive_messages(queue, count) == []
+
+
+async def test_receive_messages_empty(client: AIORSMQ, queue: str):
+    assert await client.receive_messages(queue, 10) == []
+
+
+async def test_receive_messages_failure(client: AIORSMQ, qname: str):
+    with pytest.raises(QueueNotFoundException):
+        await client.receive_messages(qname, 10)
+
+
+@pytest.mark.parametrize("count", [-1, 0])
+async def test_receive_messages_failure_arg(client: AIORSMQ, queue: str, count: int):
+    with pytest.raises(InvalidValueException):
+        await client.receive_messages(queue, count)
+
+
 async def test_pop_message_fifo_order(client: AIORSMQ, queue: str):
     messages = [str(i) for i in range(100)]
     for m in messages:
@@ -273,6 +564,39 @@ async def test_pop_message(client: AIORSMQ, qname: str):
     assert msg is None
 
 
+async def test_pop_messages(client: AIORSMQ, queue: str):
+    count = 1500
+    uids = [await client.send_message(queue, str(i)) for i in range(count)]
+
+    messages = await client.pop_messages(queue, count - 10)
+    assert [m.id for m in messages] == uids[: count - 10]
+    assert all(m.rc == 1 for m in messages)
+
+    # Received messages are placed at the end of the queue
+    await client.receive_message(queue, vt=0)
+
+    messages = await client.pop_messages(queue, count)
+    assert [m.id for m in messages] == uids[-9:] + [uids[-10]]
+    assert messages[-1].rc == 2
+
+    assert await client.pop_messages(queue, count) == []
+
+    attributes = await client.get_queue_attributes(queue)
+    assert attributes.messages == 0
+    assert attributes.total_recv == count + 1
+
+
+async def test_pop_messages_failure(client: AIORSMQ, qname: str):
+    with pytest.raises(QueueNotFoundException):
+        await client.pop_messages(qname, 10)
+
+
+@pytest.mark.parametrize("count", [-1, 0])
+async def test_pop_messages_failure_arg(client: AIORSMQ, queue: str, count: int):
+    with pytest.raises(InvalidValueException):
+        await client.pop_messages(queue, count)
+
+
 async def test_pop_message_failure(client: AIORSMQ, qname: str):
     with pytest.raises(QueueNotFoundException):
         await client.pop_message(qname)
@@ -314,6 +638,36 @@ async def test_change_message_visiblity_after_pop_failure(client: AIORSMQ, qname
         await client.change_message_visibility(qname, uid, 10)
 
 
+async def test_change_messages_visibility(client: AIORSMQ, queue: str, msg_id: str):
+    count = 1200
+    uids = await client.send_messages(queue, ["foobar"] * count)
+    await client.receive_messages(queue, count)
+
+    vts = {uid: 0 for uid in uids[1:]}
+    vts[msg_id] = 0
+
+    missing = await client.change_messages_visibility(queue, vts)
+    assert missing == [msg_id]
+
+    messages = await client.receive_messages(queue, count)
+    assert [m.id for m in messages] == uids[1:]
+
+
+async def test_change_messages_visibility_failure(
+    client: AIORSMQ, qname: str, msg_id: str
+):
+    with pytest.raises(QueueNotFoundException):
+        await client.change_messages_visibility(qname, {msg_id: 10})
+
+    await client.create_queue(qname)
+
+    with pytest.raises(InvalidValueException):
+        await client.change_messages_visibility(qname, {msg_id: -1})
+
+    with pytest.raises(InvalidValueException):
+        await client.change_messages_visibility(qname, {"testing": 10})
+
+
 async def test_delete_message_failure(client: AIORSMQ, qname: str, msg_id: str):
     # Queue does not exist yet
     with pytest.raises(MessageNotFoundException):
@@ -344,6 +698,26 @@ async def test_delete_message(client: AIORSMQ, queue: str):
     assert (await client.get_queue_attributes(queue)).messages == 0
 
 
+async def test_delete_messages(client: AIORSMQ, queue: str, msg_id: str):
+    uids = await client.send_messages(queue, ["foo", "bar", "baz"])
+    await client.receive_messages(queue, 2)
+
+    deleted = await client.delete_messages(queue, [uids[0], msg_id, uids[2], uids[0]])
+    assert deleted == [uids[0], uids[2]]
+
+    assert (await client.get_queue_attributes(queue)).messages == 1
+    assert await client.delete_messages(queue, []) == []
+
+
+async def test_delete_messages_no_queue(client: AIORSMQ, qname: str, msg_id: str):
+    assert await client.delete_messages(qname, [msg_id]) == []
+
+
+async def test_delete_messages_failure_arg(client: AIORSMQ, queue: str, msg_id: str):
+    with pytest.raises(InvalidValueException):
+        await client.delete_messages(queue, [msg_id, "testing"])
+
+
 @pytest.mark.parametrize("id", ["", "testing", "!" * 32])
 async def test_delete_message_failure_arg(client: AIORSMQ, queue: str, id: str):
     with pytest.raises(InvalidValueException):
@@ -442,6 +816,169 @@ async def test_set_queue_attributes_from_new(client: AIORSMQ, qname: str):
     assert attributes.max_size == max_size
 
 
+async def test_queue_handle(client: AIORSMQ, queue: str):
+    handle = client.queue(queue)
+    assert handle.name == queue
+
+    uid = await handle.send("foo")
+    uids = await handle.send_many(["bar", "baz"], delay=[None, 10])
+
+    message = await handle.receive(vt=0)
+    assert message and message.id == uid
+
+    messages = await handle.receive_many(10)
+    assert {m.id for m in messages} == {uid, uids[0]}
+
+    await handle.change_visibility(uid, 0)
+    assert await handle.change_visibility_many({uids[0]: 0, uids[1]: 0}) == []
+
+    popped = await handle.pop()
+    assert popped and popped.id == uid
+
+    await handle.delete(uids[0])
+    assert await handle.delete_many(uids) == [uids[1]]
+    assert await handle.pop_many(10) == []
+
+    attributes = await handle.set_attributes(vt=5)
+    assert attributes.vt == 5
+    assert (await handle.get_attributes()).total_sent == 3
+
+
+async def test_queue_handle_consume(client: AIORSMQ, queue: str):
+    handle = client.queue(queue)
+    uid = await handle.send("foo")
+
+    async with handle.consume(prefetch=1) as messages:
+        async for message in messages:
+            assert message.id == uid
+            break
+
+
+async def test_queue_handle_failure(client: AIORSMQ, qname: str):
+    handle = client.queue(qname)
+
+    with pytest.raises(QueueNotFoundException):
+        await handle.send("foo")
+
+    with pytest.raises(QueueNotFoundException):
+        await handle.receive()
+
+
+@pytest.mark.parametrize("name", ["", "foo:bar", "a" * 161])
+async def test_queue_handle_failure_arg_name(client: AIORSMQ, name: str):
+    with pytest.raises(InvalidValueException):
+        client.queue(name)
+
+
+async def test_queue_handle_failure_arg(client: AIORSMQ, queue: str):
+    handle = client.queue(queue)
+
+    with pytest.raises(InvalidValueException):
+        await handle.send("foo", delay=-1)
+
+    with pytest.raises(InvalidValueException):
+        await handle.receive_many(0)
+
+    with pytest.raises(InvalidValueException):
+        await handle.delete("foo")
+
+    with pytest.raises(NoAttributesSpecified):
+        await handle.set_attributes()
+
+
+async def test_hash_tags(redis_client: aioredis.Redis, qname: str):
+    client = AIORSMQ(client=redis_client, namespace=TEST_NS, hash_tags=True)
+    await client.create_queue(qname)
+
+    assert await client.list_queues() == [qname]
+    assert set(await redis_client.keys(f"{TEST_NS}:*{qname}*")) == {
+        f"{TEST_NS}:{{{qname}}}:Q"
+    }
+
+    uids = await client.send_messages(qname, ["foo", "bar", "baz"])
+    assert await redis_client.zcard(f"{TEST_NS}:{{{qname}}}") == 3
+
+    message = await client.receive_message(qname)
+    assert message and message.id == uids[0]
+
+    await client.change_message_visibility(qname, uids[0], 60)
+    await client.delete_message(qname, uids[1])
+
+    message = await client.pop_message(qname)
+    assert message and message.id == uids[2]
+
+    attributes = await client.get_queue_attributes(qname)
+    assert attributes.messages == 1
+    assert attributes.total_sent == 3
+
+    # Queues using the default layout are separate
+    default_client = AIORSMQ(client=redis_client, namespace=TEST_NS)
+    with pytest.raises(QueueNotFoundException):
+        await default_client.send_message(qname, "foo")
+
+    await client.delete_queue(qname)
+    assert await client.list_queues() == []
+    assert await redis_client.keys(f"{TEST_NS}:*{qname}*") == []
+
+    with pytest.raises(QueueNotFoundException):
+        await client.delete_queue(qname)
+
+
+async def test_read_client(redis_client: aioredis.Redis, queue: str):
+    # Read-only queries are sent to a different database, which contains no queues
+    rsmq = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=True),
+        read_client=aioredis.from_url(f"redis://{HOST}/1", decode_responses=True),
+        namespace=TEST_NS,
+    )
+
+    await rsmq.send_message(queue, "foobar")
+
+    with pytest.raises(QueueNotFoundException):
+        await rsmq.get_queue_attributes(queue)
+
+    assert await rsmq.list_queues() == []
+
+    # Attributes are read from the server they were written to
+    attributes = await rsmq.set_queue_attributes(queue, vt=10)
+    assert attributes.vt == 10
+    assert attributes.messages == 1
+
+    await rsmq.quit()
+
+
+async def test_pubsub_client(redis_client: aioredis.Redis, queue: str):
+    rsmq = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=True),
+        pubsub_client=aioredis.from_url(
+            f"redis://{HOST}", decode_responses=True, client_name="aiorsmq-pubsub"
+        ),
+        namespace=TEST_NS,
+        real_time=True,
+        real_time_interval=0.05,
+    )
+
+    task = asyncio.ensure_future(rsmq.receive_message(queue, wait_time=5))
+    await asyncio.sleep(0.2)
+
+    subscribers = await redis_client.client_list(_type="pubsub")
+    assert [c["name"] for c in subscribers] == ["aiorsmq-pubsub"]
+
+    uid = await rsmq.send_message(queue, "foobar")
+    message = await task
+    assert message and message.id == uid
+
+    await rsmq.quit()
+
+
+async def test_client_encoding(redis_client: aioredis.Redis):
+    rsmq = AIORSMQ(client=redis_client, client_encoding="UTF8")
+    assert rsmq._client_encoding == "utf-8"
+
+    with pytest.raises(InvalidValueException):
+        AIORSMQ(client=redis_client, client_encoding="foobar")
+
+
 async def test_quit(client: AIORSMQ):
     # Should not raise
     await client.quit()
@@ -0,0 +1,192 @@
+from typing import AsyncGenerator
+import asyncio
+
+import pytest
+import aioredis  # type: ignore
+
+from aiorsmq import AIORSMQ
+from aiorsmq.codecs import JSONCodec
+from aiorsmq.exceptions import (
+    QueueNotFoundException,
+    InvalidValueException,
+    MessageNotFoundException,
+)
+
+from tests.conftest import HOST, TEST_NS  # type: ignore
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def batching_client() -> AsyncGenerator[AIORSMQ, None]:
+    client = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=True),
+        namespace=TEST_NS,
+        send_batch_delay=0.05,
+        send_batch_size=20,
+    )
+
+    yield client
+
+    await client.quit()
+
+
+async def _script_calls(redis_client: aioredis.Redis) -> int:
+    stats = await redis_client.info("commandstats")
+    return stats.get("cmdstat_evalsha", {}).get("calls", 0)
+
+
+async def test_send_batched(
+    redis_client: aioredis.Redis, batching_client: AIORSMQ, client: AIORSMQ, queue: str
+):
+    contents = [str(i) for i in range(50)]
+
+    calls = await _script_calls(redis_client)
+    uids = await asyncio.gather(
+        *[batching_client.send_message(queue, c) for c in contents]
+    )
+
+    assert len(set(uids)) == len(contents)
+    assert await _script_calls(redis_client) - calls == 3
+
+    # Batches are sent concurrently, so only the order within each batch is kept
+    messages = await client.receive_messages(queue, len(contents))
+    assert {m.id: m.contents for m in messages} == dict(zip(uids, contents))
+
+
+async def test_send_batched_queue_handle(batching_client: AIORSMQ, queue: str):
+    handle = batching_client.queue(queue)
+    uids = await asyncio.gather(handle.send("foo"), handle.send("bar", delay=10))
+
+    message = await handle.receive()
+    assert message and message.id == uids[0]
+    assert await handle.receive() is None
+
+
+async def test_send_batched_failure_max_size(
+    batching_client: AIORSMQ, client: AIORSMQ, queue: str
+):
+    await client.set_queue_attributes(queue, max_size=1024)
+
+    results = await asyncio.gather(
+        batching_client.send_message(queue, "foo"),
+        batching_client.send_message(queue, "a" * 2000),
+        batching_client.send_message(queue, "bar"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], InvalidValueException)
+
+    messages = await client.receive_messages(queue, 10)
+    assert [m.id for m in messages] == [results[0], results[2]]
+
+
+async def test_send_batched_failure_codec(redis_client: aioredis.Redis, queue: str):
+    rsmq = AIORSMQ(
+        client=redis_client,
+        namespace=TEST_NS,
+        codec=JSONCodec(),
+        send_batch_delay=0.05,
+    )
+
+    # Only the sender of the contents that cannot be encoded fails
+    results = await asyncio.gather(
+        rsmq.send_message(queue, {"foo": 1}),
+        rsmq.send_message(queue, {"bar": object()}),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], TypeError)
+
+    message = await rsmq.receive_message(queue)
+    assert message and message.contents == {"foo": 1}
+
+
+async def test_send_batched_failure(batching_client: AIORSMQ, qname: str):
+    results = await asyncio.gather(
+        batching_client.send_message(qname, "foo"),
+        batching_client.send_message(qname, "bar"),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, QueueNotFoundException) for r in results)
+
+
+async def test_send_batched_quit(
+    redis_client: aioredis.Redis, client: AIORSMQ, queue: str
+):
+    rsmq = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=True),
+        namespace=TEST_NS,
+        send_batch_delay=60,
+    )
+
+    task = asyncio.ensure_future(rsmq.send_message(queue, "foobar"))
+    await asyncio.sleep(0.1)
+    assert not task.done()
+
+    await rsmq.quit()
+    uid = await task
+
+    message = await client.receive_message(queue)
+    assert message and message.id == uid
+
+
+@pytest.mark.parametrize("delay, size", [(-1, 10), (0.1, 0)])
+async def test_batched_failure_arg(
+    redis_client: aioredis.Redis, delay: float, size: int
+):
+    with pytest.raises(InvalidValueException):
+        AIORSMQ(client=redis_client, send_batch_delay=delay, send_batch_size=size)
+
+    with pytest.raises(InvalidValueException):
+        AIORSMQ(client=redis_client, delete_batch_delay=delay, delete_batch_size=size)
+
+
+async def test_delete_batched(
+    redis_client: aioredis.Redis, client: AIORSMQ, queue: str
+):
+    rsmq = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=True),
+        namespace=TEST_NS,
+        delete_batch_delay=0.05,
+    )
+
+    uids = await client.send_messages(queue, [str(i) for i in range(10)])
+
+    calls = await redis_client.info("commandstats")
+    results = await asyncio.gather(
+        *[rsmq.delete_message(queue, uid) for uid in uids],
+        rsmq.queue(queue).delete(uids[0]),
+        return_exceptions=True,
+    )
+
+    assert results[:-1] == [None] * len(uids)
+    assert isinstance(results[-1], MessageNotFoundException)
+    assert (await client.get_queue_attributes(queue)).messages == 0
+
+    # All deletes were sent using a single pipeline
+    stats = await redis_client.info("commandstats")
+    assert stats["cmdstat_zrem"]["calls"] - calls["cmdstat_zrem"]["calls"] == 11
+    assert stats["cmdstat_hdel"]["calls"] - calls["cmdstat_hdel"]["calls"] == 1
+
+    await rsmq.quit()
+
+
+async def test_delete_batched_quit(client: AIORSMQ, queue: str):
+    rsmq = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=True),
+        namespace=TEST_NS,
+        delete_batch_delay=60,
+    )
+
+    uid = await client.send_message(queue, "foobar")
+    task = asyncio.ensure_future(rsmq.delete_message(queue, uid))
+    await asyncio.sleep(0.1)
+    assert not task.done()
+
+    await rsmq.quit()
+    await task
+
+    assert (await client.get_queue_attributes(queue)).messages == 0
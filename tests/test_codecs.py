@@ -0,0 +1,122 @@
+from typing import Any, AsyncGenerator, Union
+import zlib
+
+import pytest
+import aioredis  # type: ignore
+
+from aiorsmq import AIORSMQ, compat
+from aiorsmq.codecs import Codec, JSONCodec, ZlibCodec
+from aiorsmq.exceptions import InvalidValueException
+
+from tests.conftest import HOST, TEST_NS  # type: ignore
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def json_client() -> AsyncGenerator[AIORSMQ, None]:
+    client = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}"),
+        namespace=TEST_NS,
+        codec=ZlibCodec(JSONCodec(), threshold=100),
+    )
+
+    yield client
+
+    await client.quit()
+
+
+def test_json_codec():
+    codec = JSONCodec()
+    value = {"foo": [1, 2.5, None, "bär"]}
+
+    data = codec.encode(value)
+    assert isinstance(data, bytes)
+    assert codec.decode(data) == value
+    assert codec.decode(data.decode()) == value
+
+
+@pytest.mark.parametrize("contents", [b"foobar", "foobar", b"a" * 1000, "a" * 1000])
+def test_zlib_codec(contents: Union[str, bytes]):
+    codec = ZlibCodec(threshold=100)
+    data = codec.encode(contents)
+
+    expected = contents.encode() if isinstance(contents, str) else contents
+    assert codec.decode(data) == expected
+
+    if len(contents) >= 100:
+        assert data[:1] == b"z"
+        assert len(data) < len(contents)
+    else:
+        assert data[:1] == b"r"
+
+
+def test_zlib_codec_incompressible():
+    contents = zlib.compress(b"a" * 1000)
+
+    data = ZlibCodec(threshold=0).encode(contents)
+    assert data == b"r" + contents
+
+
+def test_zlib_codec_failure():
+    codec = ZlibCodec()
+
+    with pytest.raises(InvalidValueException):
+        codec.decode("rfoobar")
+
+    with pytest.raises(InvalidValueException):
+        codec.decode(b"foobar")
+
+
+@pytest.mark.parametrize("kwargs", [{"threshold": -1}, {"level": 10}])
+def test_zlib_codec_failure_arg(kwargs):
+    with pytest.raises(InvalidValueException):
+        ZlibCodec(**kwargs)
+
+
+async def test_send_message_codec(json_client: AIORSMQ, queue: str):
+    contents = {"items": list(range(1000))}
+    uid = await json_client.send_message(queue, contents)
+
+    message = await json_client.receive_message(queue)
+    assert message and message.id == uid
+    assert message.contents == contents
+
+
+async def test_send_message_codec_max_size(
+    redis_client_bytes: aioredis.Redis, json_client: AIORSMQ, queue: str
+):
+    await json_client.set_queue_attributes(queue, max_size=1024)
+
+    # Larger than the maximum size, but not once compressed
+    contents = ["foobar"] * 1000
+    await json_client.send_message(queue, contents)
+
+    stored = await redis_client_bytes.hvals(compat.queue_hash(TEST_NS, queue))
+    assert b"z" + zlib.compress(JSONCodec().encode(contents)) in stored
+
+    with pytest.raises(InvalidValueException):
+        await json_client.send_message(queue, [str(i) for i in range(1000)])
+
+
+async def test_receive_messages_codec_lazy(redis_client: aioredis.Redis, queue: str):
+    class CountingCodec(Codec):
+        decoded = 0
+
+        def encode(self, value: Any) -> str:
+            return str(value)
+
+        def decode(self, data: Union[str, bytes]) -> Any:
+            self.decoded += 1
+            return int(data)
+
+    codec = CountingCodec()
+    client = AIORSMQ(client=redis_client, namespace=TEST_NS, codec=codec)
+    await client.send_messages(queue, list(range(10)))
+
+    messages = await client.receive_messages(queue, 10)
+    assert codec.decoded == 0
+
+    assert messages[0].contents == 0
+    assert messages[0].contents == 0
+    assert codec.decoded == 1
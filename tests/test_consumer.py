@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from aiorsmq import AIORSMQ
+from aiorsmq.exceptions import QueueNotFoundException, InvalidValueException
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_consume(client: AIORSMQ, queue: str):
+    uids = await client.send_messages(queue, [str(i) for i in range(25)])
+
+    received = []
+    async with client.consume(queue, prefetch=10) as messages:
+        async for message in messages:
+            received.append(message.id)
+            if len(received) == len(uids):
+                break
+
+    assert received == uids
+
+
+async def test_consume_waits(client: AIORSMQ, queue: str):
+    messages = client.consume(queue, prefetch=5)
+
+    async def send():
+        await asyncio.sleep(0.5)
+        return await client.send_message(queue, "foobar")
+
+    task = asyncio.ensure_future(send())
+    message = await asyncio.wait_for(messages.__anext__(), 5)
+    assert message.id == await task
+
+    await messages.close()
+
+    with pytest.raises(StopAsyncIteration):
+        await messages.__anext__()
+
+
+async def test_consume_close_releases_buffer(client: AIORSMQ, queue: str):
+    await client.send_messages(queue, ["foo", "bar", "baz"])
+
+    messages = client.consume(queue, prefetch=3)
+    first = await messages.__anext__()
+
+    # Give the iterator some time to fill its buffer
+    await asyncio.sleep(0.2)
+    await messages.close()
+
+    remaining = await client.receive_messages(queue, 10)
+    assert [m.contents for m in remaining] == ["bar", "baz"]
+    assert first.contents == "foo"
+
+
+async def test_consume_failure(client: AIORSMQ, qname: str):
+    with pytest.raises(QueueNotFoundException):
+        async for _ in client.consume(qname):
+            pass
+
+
+@pytest.mark.parametrize("prefetch, max_backoff", [(0, 1), (1, 0)])
+async def test_consume_failure_arg(
+    client: AIORSMQ, queue: str, prefetch: int, max_backoff: float
+):
+    with pytest.raises(InvalidValueException):
+        client.consume(queue, prefetch=prefetch, max_backoff=max_backoff)
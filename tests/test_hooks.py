@@ -0,0 +1,107 @@
+from typing import Any, List, Optional, Tuple
+
+import pytest
+
+from aiorsmq import AIORSMQ, Message
+from aiorsmq.codecs import JSONCodec
+from aiorsmq.hooks import Hook
+from aiorsmq.exceptions import QueueNotFoundException, InvalidValueException
+
+from tests.conftest import TEST_NS  # type: ignore
+
+pytestmark = pytest.mark.asyncio
+
+
+class RecordingHook(Hook):
+    def __init__(self, name: str, calls: List[Tuple[Any, ...]]) -> None:
+        self.name = name
+        self.calls = calls
+
+    def before_send(self, queue_name: str, contents: List[Any]) -> Optional[List[Any]]:
+        self.calls.append((self.name, "before_send", queue_name, contents))
+        return None
+
+    def after_send(self, queue_name: str, contents: List[Any], ids: List[str]) -> None:
+        self.calls.append((self.name, "after_send", queue_name, contents, ids))
+
+    def after_receive(self, queue_name: str, messages: List[Message]) -> None:
+        ids = [m.id for m in messages]
+        self.calls.append((self.name, "after_receive", queue_name, ids))
+
+    def on_error(self, queue_name: str, operation: str, error: Exception) -> None:
+        self.calls.append((self.name, "on_error", queue_name, operation, type(error)))
+
+
+class TracingHook(Hook):
+    def before_send(self, queue_name: str, contents: List[Any]) -> Optional[List[Any]]:
+        return [{**c, "trace": "abc"} for c in contents]
+
+
+async def test_hooks(client: AIORSMQ, queue: str):
+    calls: List[Tuple[Any, ...]] = []
+    first = RecordingHook("first", calls)
+    second = RecordingHook("second", calls)
+
+    client.add_hook(first)
+    client.add_hook(second)
+
+    uid = await client.send_message(queue, "foo")
+    assert calls == [
+        ("first", "before_send", queue, ["foo"]),
+        ("second", "before_send", queue, ["foo"]),
+        ("second", "after_send", queue, ["foo"], [uid]),
+        ("first", "after_send", queue, ["foo"], [uid]),
+    ]
+
+    calls.clear()
+    await client.queue(queue).receive()
+    await client.pop_messages(queue, 10)
+    assert calls == [
+        ("second", "after_receive", queue, [uid]),
+        ("first", "after_receive", queue, [uid]),
+        ("second", "after_receive", queue, []),
+        ("first", "after_receive", queue, []),
+    ]
+
+    calls.clear()
+    client.remove_hook(first)
+    qname = queue + "x"
+
+    with pytest.raises(QueueNotFoundException):
+        await client.send_messages(qname, ["foo", "bar"])
+
+    with pytest.raises(QueueNotFoundException):
+        await client.pop_message(qname)
+
+    assert calls == [
+        ("second", "before_send", qname, ["foo", "bar"]),
+        ("second", "on_error", qname, "send", QueueNotFoundException),
+        ("second", "on_error", qname, "pop", QueueNotFoundException),
+    ]
+
+    with pytest.raises(InvalidValueException):
+        client.remove_hook(first)
+
+
+async def test_hooks_modify(redis_client, queue: str):
+    client = AIORSMQ(
+        client=redis_client,
+        namespace=TEST_NS,
+        codec=JSONCodec(),
+        hooks=[TracingHook()],
+    )
+
+    await client.send_message(queue, {"foo": 1})
+    message = await client.receive_message(queue)
+    assert message and message.contents == {"foo": 1, "trace": "abc"}
+
+
+async def test_hooks_modify_failure(client: AIORSMQ, queue: str):
+    class BadHook(Hook):
+        def before_send(self, queue_name: str, contents: List[Any]) -> List[Any]:
+            return []
+
+    client.add_hook(BadHook())
+
+    with pytest.raises(InvalidValueException):
+        await client.send_message(queue, "foo")
@@ -0,0 +1,123 @@
+from typing import AsyncGenerator, Tuple
+
+import pytest
+import aioredis  # type: ignore
+
+from aiorsmq import AIORSMQ
+from aiorsmq.instrumentation import Metrics, to_prometheus
+from aiorsmq.exceptions import QueueNotFoundException
+
+from tests.conftest import HOST, TEST_NS  # type: ignore
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def instrumented_client() -> AsyncGenerator[Tuple[AIORSMQ, Metrics], None]:
+    metrics = Metrics()
+    client = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=True),
+        namespace=TEST_NS,
+        metrics=metrics,
+    )
+
+    yield client, metrics
+
+    await client.quit()
+
+
+async def test_metrics(instrumented_client: Tuple[AIORSMQ, Metrics], queue: str):
+    rsmq, metrics = instrumented_client
+
+    await rsmq.send_message(queue, "foo")
+    await rsmq.queue(queue).send("bar")
+
+    message = await rsmq.receive_message(queue)
+    assert message
+    await rsmq.receive_message(queue)
+    await rsmq.receive_message(queue)
+
+    await rsmq.delete_message(queue, message.id)
+
+    with pytest.raises(QueueNotFoundException):
+        await rsmq.get_queue_attributes(queue + "x")
+
+    snapshot = metrics.snapshot()
+    assert set(snapshot) == {
+        "send_message",
+        "receive_message",
+        "delete_message",
+        "get_queue_attributes",
+    }
+
+    send = snapshot["send_message"]
+    assert send["calls"] == 2
+    assert send["errors"] == {}
+    assert send["round_trips"] == 2
+    assert send["latency_sum"] > 0
+    assert send["latency_buckets"][-1] == (float("inf"), 2)
+
+    receive = snapshot["receive_message"]
+    assert receive["calls"] == 3
+    assert receive["empty"] == 1
+    assert receive["round_trips"] == 3
+
+    attributes = snapshot["get_queue_attributes"]
+    assert attributes["errors"] == {"QueueNotFoundException": 1}
+    assert attributes["round_trips"] == 2
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+async def test_metrics_buckets(redis_client: aioredis.Redis, queue: str):
+    metrics = Metrics(buckets=[10.0, 0.0])
+    rsmq = AIORSMQ(client=redis_client, namespace=TEST_NS, metrics=metrics)
+
+    await rsmq.send_messages(queue, ["foo", "bar"])
+
+    buckets = metrics.snapshot()["send_messages"]["latency_buckets"]
+    assert buckets == [(0.0, 0), (10.0, 1), (float("inf"), 1)]
+
+
+async def test_metrics_disabled(client: AIORSMQ, queue: str):
+    # Should not raise
+    await client.send_message(queue, "foo")
+    await client.queue(queue).receive()
+
+
+def test_to_prometheus():
+    snapshot = {
+        "receive_message": {
+            "calls": 3,
+            "errors": {"QueueNotFoundException": 1},
+            "empty": 1,
+            "round_trips": 2,
+            "latency_sum": 0.5,
+            "latency_buckets": [(0.1, 2), (1.0, 3), (float("inf"), 3)],
+        }
+    }
+
+    text = to_prometheus(snapshot, prefix="rsmq")
+    assert text.splitlines() == [
+        "# HELP rsmq_calls_total Number of calls.",
+        "# TYPE rsmq_calls_total counter",
+        'rsmq_calls_total{operation="receive_message"} 3',
+        "# HELP rsmq_errors_total Number of calls that raised an error.",
+        "# TYPE rsmq_errors_total counter",
+        'rsmq_errors_total{operation="receive_message",'
+        'exception="QueueNotFoundException"} 1',
+        "# HELP rsmq_empty_total Number of receives or pops that found no messages.",
+        "# TYPE rsmq_empty_total counter",
+        'rsmq_empty_total{operation="receive_message"} 1',
+        "# HELP rsmq_round_trips_total Number of round trips to Redis.",
+        "# TYPE rsmq_round_trips_total counter",
+        'rsmq_round_trips_total{operation="receive_message"} 2',
+        "# HELP rsmq_latency_seconds Latency of calls (in seconds).",
+        "# TYPE rsmq_latency_seconds histogram",
+        'rsmq_latency_seconds_bucket{operation="receive_message",le="0.1"} 2',
+        'rsmq_latency_seconds_bucket{operation="receive_message",le="1.0"} 3',
+        'rsmq_latency_seconds_bucket{operation="receive_message",le="+Inf"} 3',
+        'rsmq_latency_seconds_sum{operation="receive_message"} 0.5',
+        'rsmq_latency_seconds_count{operation="receive_message"} 3',
+    ]
@@ -0,0 +1,77 @@
+import pytest
+
+from aiorsmq import AIORSMQ
+from aiorsmq.loadgen import LoadConfig, parse_payload_sizes, run
+from aiorsmq.exceptions import InvalidValueException
+
+pytestmark = pytest.mark.asyncio
+
+
+def test_parse_payload_sizes():
+    assert parse_payload_sizes("16") == [(16, 16, 1.0)]
+    assert parse_payload_sizes("16:9,1024-4096:1") == [
+        (16, 16, 9.0),
+        (1024, 4096, 1.0),
+    ]
+
+    for value in ["", "foo", "16:0", "4096-1024", "-16"]:
+        with pytest.raises(InvalidValueException):
+            parse_payload_sizes(value)
+
+
+async def test_run(client: AIORSMQ, qname: str):
+    config = LoadConfig(
+        queue_name=qname,
+        producers=2,
+        consumers=4,
+        messages=200,
+        payload_sizes=parse_payload_sizes("16:3,100-1000:1"),
+        send_batch_size=5,
+        receive_batch_size=3,
+        vt=1,
+        failure_ratio=0.1,
+        drain_timeout=10,
+    )
+
+    report = await run(client, config)
+
+    assert report["sent"] == 200
+    assert report["deleted"] == 200
+    assert report["unique_received"] == 200
+    assert report["lost"] == 0
+    assert report["redeliveries"] == report["received"] - 200
+    assert report["redeliveries"] >= report["failures"]
+    assert report["violations"] == 0
+    assert report["errors"] == {}
+    assert qname not in await client.list_queues()
+
+
+async def test_run_real_time(client: AIORSMQ, qname: str):
+    config = LoadConfig(
+        queue_name=qname, consumers=2, messages=50, vt=5, real_time=True
+    )
+
+    report = await run(client, config)
+
+    assert report["deleted"] == 50
+    assert report["redeliveries"] == 0
+    assert report["violations"] == 0
+
+
+async def test_run_existing_queue(client_bytes: AIORSMQ, qname: str):
+    # The queue is left in place by the first run, and recreated by the second
+    config = LoadConfig(queue_name=qname, messages=10, keep_queue=True)
+
+    for _ in range(2):
+        report = await run(client_bytes, config)
+        assert report["deleted"] == 10
+
+    assert (await client_bytes.get_queue_attributes(qname)).total_sent == 10
+
+
+async def test_run_invalid(client: AIORSMQ, qname: str):
+    with pytest.raises(InvalidValueException):
+        await run(client, LoadConfig(queue_name=qname, consumers=0))
+
+    with pytest.raises(InvalidValueException):
+        await run(client, LoadConfig(queue_name=qname, failure_ratio=2))
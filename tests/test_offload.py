@@ -0,0 +1,237 @@
+from typing import AsyncGenerator, List
+
+import pytest
+import aioredis  # type: ignore
+
+from aiorsmq import AIORSMQ, Message, compat, offload
+from aiorsmq.codecs import JSONCodec
+from aiorsmq.exceptions import (
+    QueueNotFoundException,
+    InvalidValueException,
+    MessageNotFoundException,
+)
+
+from tests.conftest import HOST, TEST_NS  # type: ignore
+
+pytestmark = pytest.mark.asyncio
+
+CHUNK_SIZE = 1000
+
+
+def _offload_client(decode: bool, **kwargs) -> AIORSMQ:
+    return AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=decode),
+        namespace=TEST_NS,
+        offload_threshold=2000,
+        offload_chunk_size=CHUNK_SIZE,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+async def offload_client() -> AsyncGenerator[AIORSMQ, None]:
+    client = _offload_client(decode=False)
+    yield client
+    await client.quit()
+
+
+@pytest.fixture
+async def offload_client_str() -> AsyncGenerator[AIORSMQ, None]:
+    client = _offload_client(decode=True)
+    yield client
+    await client.quit()
+
+
+async def _chunk_keys(redis_client: aioredis.Redis, queue: str):
+    prefix = compat.queue_chunks_prefix(TEST_NS, queue)
+    return [key async for key in redis_client.scan_iter(match=prefix + "*")]
+
+
+async def _read_chunks(message: Message) -> List[bytes]:
+    chunks = []
+    async for chunk in message.stream():
+        assert isinstance(chunk, bytes)
+        chunks.append(chunk)
+
+    return chunks
+
+
+def test_split():
+    data = bytes(range(256)) * 10
+    chunks = offload.split(data, 1000, None)
+
+    assert [len(c) for c in chunks] == [1000, 1000, 560]
+    assert b"".join(chunks) == data
+
+
+def test_split_text():
+    data = ("añb€" * 1000).encode()
+    chunks = offload.split(data, 100, "utf-8")
+
+    assert all(len(c) <= 100 for c in chunks)
+    assert "".join(bytes(c).decode() for c in chunks) == "añb€" * 1000
+
+
+async def test_send_message_offload(
+    redis_client: aioredis.Redis, offload_client: AIORSMQ, queue: str
+):
+    # Larger than the queue's maximum message size
+    contents = bytes(range(256)) * 1000
+    uid = await offload_client.send_message(queue, contents)
+    small = await offload_client.send_message(queue, b"foobar")
+
+    keys = await _chunk_keys(redis_client, queue)
+    assert len(keys) == 1
+    assert await redis_client.llen(keys[0]) == -(-len(contents) // CHUNK_SIZE)
+
+    messages = await offload_client.receive_messages(queue, 10)
+    assert [m.id for m in messages] == [uid, small]
+    assert messages[0].contents == contents
+    assert messages[1].contents == b"foobar"
+
+    await offload_client.delete_message(queue, uid)
+    assert await _chunk_keys(redis_client, queue) == []
+
+
+async def test_send_message_offload_threshold(
+    redis_client: aioredis.Redis,
+    offload_client: AIORSMQ,
+    offload_client_str: AIORSMQ,
+    queue: str,
+):
+    # Only messages larger than the threshold (2000 bytes) are offloaded
+    await offload_client.send_message(queue, b"a" * 2000)
+    assert await _chunk_keys(redis_client, queue) == []
+
+    await offload_client.send_message(queue, b"a" * 2001)
+    assert len(await _chunk_keys(redis_client, queue)) == 1
+
+    # The threshold applies to the encoded contents: 667 characters, 2001 bytes
+    await offload_client_str.send_message(queue, "€" * 667)
+    assert len(await _chunk_keys(redis_client, queue)) == 2
+
+    messages = await offload_client.receive_messages(queue, 10)
+    assert [len(m.contents) for m in messages] == [2000, 2001, 2001]
+
+
+async def test_send_message_offload_text(
+    redis_client: aioredis.Redis, offload_client_str: AIORSMQ, queue: str
+):
+    contents = "añb€" * 1000
+    await offload_client_str.send_messages(queue, [contents, contents])
+
+    messages = await offload_client_str.receive_messages(queue, 10)
+    assert [m.contents for m in messages] == [contents, contents]
+
+    await offload_client_str.delete_messages(queue, [m.id for m in messages])
+    assert await _chunk_keys(redis_client, queue) == []
+
+
+async def test_send_message_offload_codec(redis_client: aioredis.Redis, queue: str):
+    client = _offload_client(decode=False, codec=JSONCodec())
+    contents = {"items": list(range(1000))}
+
+    await client.send_message(queue, contents)
+    assert len(await _chunk_keys(redis_client, queue)) == 1
+
+    message = await client.receive_message(queue)
+    assert message and message.contents == contents
+
+    await client.quit()
+
+
+async def test_pop_message_offload(
+    redis_client: aioredis.Redis, offload_client: AIORSMQ, queue: str
+):
+    contents = b"a" * 5000
+    await offload_client.send_message(queue, contents)
+
+    message = await offload_client.pop_message(queue)
+    assert message and message.contents == contents
+    assert await _chunk_keys(redis_client, queue) == []
+
+
+async def test_receive_message_offload_stream(
+    redis_client: aioredis.Redis, client: AIORSMQ, queue: str
+):
+    rsmq = _offload_client(decode=False, offload_stream=True)
+    contents = bytes(range(256)) * 100
+    uid = await rsmq.send_message(queue, contents)
+
+    message = await rsmq.receive_message(queue)
+    assert message and message.id == uid
+
+    with pytest.raises(InvalidValueException):
+        message.contents
+
+    chunks = await _read_chunks(message)
+    assert len(chunks) == -(-len(contents) // CHUNK_SIZE)
+    assert b"".join(chunks) == contents
+
+    await rsmq.send_message(queue, b"foobar")
+    message = await rsmq.pop_message(queue)
+    assert message and [c async for c in message.stream()] == [b"foobar"]
+
+    # Chunks of popped messages are deleted once they have been read
+    await rsmq.change_message_visibility(queue, uid, 0)
+    message = await rsmq.pop_message(queue)
+    assert message and message.id == uid
+    assert b"".join(await _read_chunks(message)) == contents
+    assert await _chunk_keys(redis_client, queue) == []
+
+    with pytest.raises(MessageNotFoundException):
+        async for _ in message.stream():
+            pass
+
+    await rsmq.quit()
+
+
+async def test_receive_message_offload_stream_deleted(
+    redis_client: aioredis.Redis, queue: str
+):
+    rsmq = _offload_client(decode=False, offload_stream=True)
+    await rsmq.send_message(queue, bytes(range(256)) * 100)
+    message = await rsmq.receive_message(queue)
+    assert message
+
+    chunks = message.stream()
+    await chunks.__anext__()
+    await redis_client.delete(*await _chunk_keys(redis_client, queue))
+
+    # The remaining chunks must not be silently skipped
+    with pytest.raises(MessageNotFoundException):
+        async for _ in chunks:
+            pass
+
+    await rsmq.quit()
+
+
+async def test_send_message_offload_failure(
+    redis_client: aioredis.Redis, offload_client: AIORSMQ, qname: str
+):
+    with pytest.raises(QueueNotFoundException):
+        await offload_client.send_message(qname, b"a" * 5000)
+
+    assert await _chunk_keys(redis_client, qname) == []
+
+
+async def test_delete_queue_offload(
+    redis_client: aioredis.Redis, offload_client: AIORSMQ, queue: str
+):
+    await offload_client.send_messages(queue, [b"a" * 5000, b"b" * 5000])
+    assert len(await _chunk_keys(redis_client, queue)) == 2
+
+    await offload_client.delete_queue(queue)
+    assert await _chunk_keys(redis_client, queue) == []
+
+
+@pytest.mark.parametrize("threshold, chunk_size", [(-1, 1000), (1000, 0)])
+async def test_offload_failure_arg(
+    redis_client: aioredis.Redis, threshold: int, chunk_size: int
+):
+    with pytest.raises(InvalidValueException):
+        AIORSMQ(
+            client=redis_client,
+            offload_threshold=threshold,
+            offload_chunk_size=chunk_size,
+        )
@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+import aioredis  # type: ignore
+
+from aiorsmq import AIORSMQ, PartitionedQueue
+from aiorsmq.exceptions import (
+    QueueExistsException,
+    QueueNotFoundException,
+    InvalidValueException,
+    MessageNotFoundException,
+)
+
+from tests.conftest import HOST, TEST_NS  # type: ignore
+
+pytestmark = pytest.mark.asyncio
+
+PARTITIONS = 3
+
+
+@pytest.fixture
+async def pqueue(client: AIORSMQ, qname: str) -> PartitionedQueue:
+    queue = PartitionedQueue(rsmq=client, name=qname, partitions=PARTITIONS)
+    await queue.create_queue()
+    return queue
+
+
+async def test_create(client: AIORSMQ, pqueue: PartitionedQueue, qname: str):
+    assert sorted(await client.list_queues()) == [
+        f"{qname}-{i}" for i in range(PARTITIONS)
+    ]
+
+    with pytest.raises(QueueExistsException):
+        await pqueue.create_queue()
+
+    await pqueue.delete_queue()
+    assert await client.list_queues() == []
+
+    with pytest.raises(QueueNotFoundException):
+        await pqueue.delete_queue()
+
+
+async def test_send_round_robin(pqueue: PartitionedQueue):
+    for i in range(PARTITIONS * 2):
+        await pqueue.send(str(i))
+
+    for partition in pqueue.partitions:
+        assert (await partition.get_attributes()).messages == 2
+
+    ids = await pqueue.send_many([str(i) for i in range(PARTITIONS)])
+    assert len(set(ids)) == PARTITIONS
+
+    for partition in pqueue.partitions:
+        assert (await partition.get_attributes()).messages == 3
+
+
+async def test_send_key(pqueue: PartitionedQueue):
+    index = pqueue.partition_for("foo")
+    assert index == pqueue.partition_for(b"foo")
+
+    await pqueue.send("bar", key="foo")
+    await pqueue.send_many(["baz", "qux"], key="foo")
+
+    for i, partition in enumerate(pqueue.partitions):
+        expected = 3 if i == index else 0
+        assert (await partition.get_attributes()).messages == expected
+
+
+async def test_receive(pqueue: PartitionedQueue):
+    ids = await pqueue.send_many([str(i) for i in range(10)])
+
+    messages = await pqueue.receive_many(4)
+    messages += await pqueue.receive_many(10)
+    assert sorted(m.id for m in messages) == sorted(ids)
+    assert {m.id: m.contents for m in messages} == {
+        id: str(i) for i, id in enumerate(ids)
+    }
+
+    assert await pqueue.receive() is None
+
+    await pqueue.change_visibility(ids[0], 0)
+    message = await pqueue.receive()
+    assert message and message.id == ids[0] and message.rc == 2
+
+    assert await pqueue.delete_many(ids[:2]) == ids[:2]
+    await pqueue.delete(ids[2])
+
+    with pytest.raises(MessageNotFoundException):
+        await pqueue.delete(ids[2])
+
+    missing = await pqueue.change_visibility_many({ids[2]: 0, ids[3]: 0})
+    assert missing == [ids[2]]
+
+    attributes = await pqueue.get_attributes()
+    assert attributes.messages == 7
+    assert attributes.total_sent == 10
+    assert attributes.total_recv == 11
+
+
+async def test_receive_fair(pqueue: PartitionedQueue):
+    # Every partition contains messages, so each receive should be served by a
+    # different partition.
+    ids = await pqueue.send_many([str(i) for i in range(PARTITIONS * 2)])
+
+    received = [await pqueue.receive() for _ in range(PARTITIONS)]
+    partitions = {m.id.rsplit(":", 1)[1] for m in received if m}
+    assert len(partitions) == PARTITIONS
+
+    messages = await pqueue.pop_many(10)
+    assert len(messages) == PARTITIONS
+    assert {m.id for m in messages} | {m.id for m in received if m} == set(ids)
+
+
+async def test_receive_wait(client: AIORSMQ, pqueue: PartitionedQueue):
+    async def send() -> None:
+        await asyncio.sleep(0.2)
+        await pqueue.partitions[-1].send("foobar")
+
+    task = asyncio.ensure_future(send())
+    message = await pqueue.receive(wait_time=5)
+    await task
+
+    assert message and message.contents == "foobar"
+
+
+async def test_consume(pqueue: PartitionedQueue):
+    ids = await pqueue.send_many([str(i) for i in range(10)])
+
+    received = []
+    async with pqueue.consume(prefetch=4) as messages:
+        async for message in messages:
+            received.append(message.id)
+            if len(received) == 6:
+                break
+
+    # Buffered messages are made visible again
+    remaining = await pqueue.pop_many(10)
+    assert sorted(received + [m.id for m in remaining]) == sorted(ids)
+
+
+async def test_multiple_clients(
+    redis_client: aioredis.Redis, client: AIORSMQ, qname: str
+):
+    other = AIORSMQ(
+        client=aioredis.from_url(f"redis://{HOST}", decode_responses=True),
+        namespace=TEST_NS + "2",
+    )
+    pqueue = PartitionedQueue(rsmq=[client, other], name=qname, partitions=PARTITIONS)
+    await pqueue.create_queue()
+
+    assert sorted(await client.list_queues()) == [f"{qname}-0", f"{qname}-2"]
+    assert await other.list_queues() == [f"{qname}-1"]
+
+    ids = await pqueue.send_many(["foo", "bar", "baz"])
+    messages = await pqueue.pop_many(3)
+    assert sorted(m.id for m in messages) == sorted(ids)
+
+    await other.quit()
+
+
+@pytest.mark.parametrize("id", ["foo", "foo:bar", "foo:3"])
+async def test_failure_arg_id(pqueue: PartitionedQueue, id: str):
+    with pytest.raises(InvalidValueException):
+        await pqueue.delete(id)
+
+    with pytest.raises(InvalidValueException):
+        await pqueue.change_visibility(id, 0)
+
+
+async def test_failure_arg(client: AIORSMQ):
+    with pytest.raises(InvalidValueException):
+        PartitionedQueue(rsmq=client, name="foo", partitions=0)
+
+    with pytest.raises(InvalidValueException):
+        PartitionedQueue(rsmq=[], name="foo", partitions=1)
+
+    with pytest.raises(InvalidValueException):
+        PartitionedQueue(rsmq=client, name="foo.bar", partitions=1)
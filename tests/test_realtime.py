@@ -0,0 +1,120 @@
+from typing import List, Union
+import asyncio
+
+import pytest
+import aioredis  # type: ignore
+
+from aiorsmq.realtime import NotificationThrottle, RealTimeListener
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_notification_throttle_prune():
+    published = []
+
+    async def publish(channel: str, key_sorted_set: str) -> None:
+        published.append(channel)
+
+    throttle = NotificationThrottle(interval=0.05, publish=publish)
+
+    for i in range(100):
+        assert throttle.acquire(f"channel-{i}", f"key-{i}")
+
+    await asyncio.sleep(0.1)
+
+    # Channels whose interval has elapsed are forgotten
+    assert throttle.acquire("foo", "bar")
+    assert list(throttle._next) == ["foo"]
+    assert published == []
+
+    await throttle.close()
+
+
+async def test_listener_reader_task(redis_client: aioredis.Redis):
+    listener = RealTimeListener(client=redis_client, client_encoding="utf-8")
+    received: List[Union[str, bytes]] = []
+
+    await listener.subscribe("foo", received.append)
+    task = listener._task
+    assert task is not None
+
+    # The reader task is kept while subscribers come and go
+    await listener.unsubscribe("foo", received.append)
+    await asyncio.sleep(0.1)
+    assert not task.done()
+
+    await listener.subscribe("foo", received.append)
+    assert listener._task is task
+
+    await redis_client.publish("foo", "bar")
+    for _ in range(20):
+        if received:
+            break
+        await asyncio.sleep(0.05)
+
+    assert received == ["bar"]
+
+    await listener.close()
+    assert task.done()
+
+
+async def _numsub(redis_client: aioredis.Redis, channel: str) -> int:
+    return (await redis_client.pubsub_numsub(channel))[0][1]
+
+
+def _delay(monkeypatch, obj, name: str, delay: float = 0.1) -> None:
+    method = getattr(obj, name)
+
+    async def delayed(*args):
+        await asyncio.sleep(delay)
+        return await method(*args)
+
+    monkeypatch.setattr(obj, name, delayed)
+
+
+async def test_listener_unsubscribe_pending(redis_client: aioredis.Redis, monkeypatch):
+    listener = RealTimeListener(client=redis_client, client_encoding="utf-8")
+    received: List[Union[str, bytes]] = []
+    other: List[Union[str, bytes]] = []
+
+    await listener.subscribe("foo", other.append)
+    assert listener._pubsub is not None
+    _delay(monkeypatch, listener._pubsub, "unsubscribe")
+
+    # The channel is subscribed to again while the UNSUBSCRIBE is being sent
+    await asyncio.gather(
+        listener.unsubscribe("foo", other.append),
+        listener.subscribe("foo", received.append),
+    )
+    assert await _numsub(redis_client, "foo") == 1
+
+    await redis_client.publish("foo", "bar")
+    for _ in range(20):
+        if received:
+            break
+        await asyncio.sleep(0.05)
+
+    assert received == ["bar"]
+    assert other == []
+    assert listener._locks == {}
+
+    await listener.close()
+
+
+async def test_listener_subscribe_pending(redis_client: aioredis.Redis, monkeypatch):
+    listener = RealTimeListener(client=redis_client, client_encoding="utf-8")
+    received: List[Union[str, bytes]] = []
+
+    await listener.subscribe("bar", received.append)
+    assert listener._pubsub is not None
+    _delay(monkeypatch, listener._pubsub, "subscribe")
+
+    # The only subscriber unsubscribes while the SUBSCRIBE is being sent
+    await asyncio.gather(
+        listener.subscribe("foo", received.append),
+        listener.unsubscribe("foo", received.append),
+    )
+    assert await _numsub(redis_client, "foo") == 0
+    assert listener._locks == {}
+
+    await listener.close()
@@ -1,10 +1,26 @@
-from aiorsmq import utils
-
 import pytest
 
+from aiorsmq import utils
+
 
 def test_ensure():
     with pytest.raises(RuntimeError):
         utils.ensure(None)
 
     assert utils.ensure(1) == 1
+
+
+@pytest.mark.parametrize(
+    "value, encoding",
+    [
+        ("foobar", "utf-8"),
+        ("foobar", "UTF8"),
+        ("añb", "utf-8"),
+        ("añb", "latin-1"),
+        ("foobar", "utf-16"),
+        ("", "utf-8"),
+    ],
+)
+def test_encoded_length(value: str, encoding: str):
+    name = utils.normalize_encoding(encoding)
+    assert utils.encoded_length(value, name) == len(value.encode(encoding))
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from aiorsmq import AIORSMQ, Message, Worker
+from aiorsmq.exceptions import QueueNotFoundException, InvalidValueException
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _run_until(worker: Worker, condition, timeout: float = 5):
+    task = asyncio.ensure_future(worker.run())
+
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+    while not condition() and loop.time() < deadline:
+        await asyncio.sleep(0.05)
+
+    await worker.stop()
+    await task
+
+
+async def test_worker(client: AIORSMQ, queue: str):
+    contents = [str(i) for i in range(50)]
+    await client.send_messages(queue, contents)
+
+    processed = []
+    running = 0
+    max_running = 0
+
+    async def handler(message: Message):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        processed.append(message.contents)
+        running -= 1
+
+    worker = Worker(rsmq=client, queue_name=queue, handler=handler, concurrency=5)
+    await _run_until(worker, lambda: len(processed) == len(contents))
+
+    assert sorted(processed) == sorted(contents)
+    assert max_running == 5
+    assert (await client.get_queue_attributes(queue)).messages == 0
+
+
+async def test_worker_failure_redelivery(client: AIORSMQ, queue: str):
+    uid = await client.send_message(queue, "foobar")
+    received = []
+
+    async def handler(message: Message):
+        received.append(message.rc)
+        if message.rc == 1:
+            raise Exception("Failed")
+
+    worker = Worker(rsmq=client, queue_name=queue, handler=handler, vt=1)
+    await _run_until(worker, lambda: len(received) == 2)
+
+    assert received == [1, 2]
+    assert await client.delete_messages(queue, [uid]) == []
+
+
+async def test_worker_heartbeat(client: AIORSMQ, queue: str):
+    await client.send_message(queue, "foobar")
+    done = []
+
+    async def handler(message: Message):
+        await asyncio.sleep(2.5)
+        done.append(message)
+
+    worker = Worker(rsmq=client, queue_name=queue, handler=handler, vt=1)
+    task = asyncio.ensure_future(worker.run())
+
+    for _ in range(4):
+        await asyncio.sleep(0.5)
+        assert await client.receive_message(queue) is None
+
+    await worker.stop()
+    await task
+
+    assert len(done) == 1
+    assert (await client.get_queue_attributes(queue)).messages == 0
+
+
+async def test_worker_failure(client: AIORSMQ, qname: str):
+    async def handler(message: Message):
+        pass
+
+    worker = Worker(rsmq=client, queue_name=qname, handler=handler)
+    with pytest.raises(QueueNotFoundException):
+        await worker.run()
+
+    with pytest.raises(InvalidValueException):
+        Worker(rsmq=client, queue_name=qname, handler=handler, concurrency=0)
+
+    with pytest.raises(InvalidValueException):
+        Worker(rsmq=client, queue_name=qname, handler=handler, ack_batch_size=0)
+
+    with pytest.raises(InvalidValueException):
+        Worker(rsmq=client, queue_name=qname, handler=handler, ack_interval=0)
+
+
+async def test_worker_stop_before_run(client: AIORSMQ, queue: str):
+    await client.send_message(queue, "foobar")
+    received = []
+
+    async def handler(message: Message):
+        received.append(message)
+
+    worker = Worker(rsmq=client, queue_name=queue, handler=handler)
+    task = asyncio.ensure_future(worker.run())
+
+    # The task has not started running yet
+    await worker.stop()
+    await asyncio.wait_for(task, timeout=5)
+
+    assert received == []
+
+
+async def test_worker_heartbeat_prefetch(client: AIORSMQ, queue: str):
+    await client.send_messages(queue, [str(i) for i in range(4)])
+    received = []
+
+    async def handler(message: Message):
+        received.append((message.contents, message.rc))
+        await asyncio.sleep(0.6)
+
+    # Messages wait in the buffer for longer than their visibility timer
+    worker = Worker(
+        rsmq=client, queue_name=queue, handler=handler, concurrency=1, prefetch=4, vt=1
+    )
+    task = asyncio.ensure_future(worker.run())
+
+    # Leave time for any redelivered message to be processed too
+    await asyncio.sleep(4)
+    await worker.stop()
+    await task
+
+    assert sorted(received) == [(str(i), 1) for i in range(4)]